@@ -3,8 +3,10 @@ Unified EROS Scoring System
 Single metric to track creator performance and schedule effectiveness
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, List
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +28,17 @@ class EROSScoring:
     - Critical: 0-19
     """
 
+    # Component weights shared by the scalar and batch scoring paths
+    _WEIGHTS = MappingProxyType({
+        'revenue_per_send': 0.4,
+        'conversion_rate': 0.3,
+        'execution_rate': 0.2,
+        'caption_diversity': 0.1
+    })
+
+    # Sort order for improvement recommendations (lower = more urgent)
+    _PRIORITY_ORDER = MappingProxyType({'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3})
+
     @staticmethod
     def calculate_eros_score(
         revenue_per_send: float,
@@ -60,11 +73,8 @@ class EROSScoring:
         diversity_score = caption_diversity * 100
 
         # Calculate weighted EROS score
-        eros_score = (
-            rps_score * 0.4 +
-            conversion_score * 0.3 +
-            execution_score * 0.2 +
-            diversity_score * 0.1
+        eros_score = EROSScoring._weighted_sum(
+            rps_score, conversion_score, execution_score, diversity_score
         )
 
         # Determine tier
@@ -94,14 +104,64 @@ class EROSScoring:
                 'execution_score': round(execution_score, 1),
                 'diversity_score': round(diversity_score, 1)
             },
-            'weights': {
-                'revenue_per_send': 0.4,
-                'conversion_rate': 0.3,
-                'execution_rate': 0.2,
-                'caption_diversity': 0.1
-            }
+            'weights': dict(EROSScoring._WEIGHTS)
         }
 
+    @staticmethod
+    def _weighted_sum(rps_score, conversion_score, execution_score, diversity_score):
+        """Weighted EROS combination; works on floats and NumPy arrays alike"""
+
+        weights = EROSScoring._WEIGHTS
+        return (
+            rps_score * weights['revenue_per_send'] +
+            conversion_score * weights['conversion_rate'] +
+            execution_score * weights['execution_rate'] +
+            diversity_score * weights['caption_diversity']
+        )
+
+    @staticmethod
+    def calculate_eros_scores_batch(metrics_df: pd.DataFrame) -> np.ndarray:
+        """
+        Vectorized EROS score for many creators at once.
+
+        Same formula as calculate_eros_score, evaluated column-wise so batch
+        scoring does not build a result dict per creator.
+
+        Args:
+            metrics_df: DataFrame with the calculate_from_metrics keys as columns
+                        (execution_rate / caption_diversity optional)
+
+        Returns:
+            Array of unrounded EROS scores, one per row
+        """
+
+        n = len(metrics_df)
+
+        def column(name: str, default: float) -> np.ndarray:
+            if name in metrics_df.columns:
+                return metrics_df[name].fillna(default).to_numpy(dtype=np.float64)
+            return np.full(n, default, dtype=np.float64)
+
+        rps_score = np.minimum(column('avg_revenue_per_send', 0) / 5.0 * 100, 100)
+        conversion_score = np.minimum(column('avg_purchase_rate', 0) * 100, 100)
+        execution_score = column('execution_rate', 100)
+        diversity_score = column('caption_diversity', 0.8) * 100
+
+        return EROSScoring._weighted_sum(
+            rps_score, conversion_score, execution_score, diversity_score
+        )
+
+    @staticmethod
+    def assign_tiers(eros_scores: np.ndarray) -> pd.Categorical:
+        """Map EROS scores to tier labels (same cut points as calculate_eros_score)"""
+
+        return pd.cut(
+            eros_scores,
+            bins=[-np.inf, 20, 40, 60, 80, np.inf],
+            labels=['Critical', 'Needs Improvement', 'Standard', 'High', 'Elite'],
+            right=False
+        )
+
     @staticmethod
     def calculate_from_metrics(metrics: Dict) -> Dict:
         """
@@ -150,7 +210,7 @@ class EROSScoring:
         }
 
     @staticmethod
-    def get_improvement_recommendations(eros_result: Dict) -> List[str]:
+    def get_improvement_recommendations(eros_result: Dict) -> List[Dict]:
         """
         Generate recommendations based on EROS score breakdown.
         Returns prioritized list of improvements.
@@ -193,7 +253,7 @@ class EROSScoring:
             })
 
         # Sort by priority
-        priority_order = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
+        priority_order = EROSScoring._PRIORITY_ORDER
         recommendations.sort(key=lambda x: priority_order[x['priority']])
 
         return recommendations
@@ -217,21 +277,32 @@ class AgencyDashboard:
         if not creator_scores:
             return {'error': 'No creator data'}
 
-        total_revenue = sum(c.get('revenue', 0) for c in creator_scores)
+        n = len(creator_scores)
+        scores = np.fromiter(
+            (c['eros_score'] for c in creator_scores),
+            dtype=np.float64,
+            count=n
+        )
+        revenues = np.fromiter(
+            (c.get('revenue', 0) for c in creator_scores),
+            dtype=np.float64,
+            count=n
+        )
 
-        # Weight scores by revenue contribution
-        weighted_scores = []
-        for creator in creator_scores:
-            weight = creator.get('revenue', 0) / total_revenue if total_revenue > 0 else 1.0 / len(creator_scores)
-            weighted_scores.append(creator['eros_score'] * weight)
+        # Weight scores by revenue contribution (equal weights if no revenue)
+        total_revenue = revenues.sum()
+        if total_revenue > 0:
+            weights = revenues / total_revenue
+        else:
+            weights = np.full(n, 1.0 / n)
 
-        agency_score = sum(weighted_scores)
+        agency_score = float(np.dot(scores, weights))
 
-        # Calculate distribution
-        elite_count = sum(1 for c in creator_scores if c['eros_score'] >= 80)
-        high_count = sum(1 for c in creator_scores if 60 <= c['eros_score'] < 80)
-        standard_count = sum(1 for c in creator_scores if 40 <= c['eros_score'] < 60)
-        low_count = sum(1 for c in creator_scores if c['eros_score'] < 40)
+        # Calculate distribution (bucket 0: <40, 1: 40-59, 2: 60-79, 3: 80+)
+        low_count, standard_count, high_count, elite_count = np.bincount(
+            np.digitize(scores, [40, 60, 80]),
+            minlength=4
+        ).tolist()
 
         return {
             'agency_eros_score': round(agency_score, 1),
@@ -242,17 +313,32 @@ class AgencyDashboard:
                 'standard': standard_count,
                 'needs_improvement': low_count
             },
-            'top_performers': sorted(
-                creator_scores,
-                key=lambda x: x['eros_score'],
-                reverse=True
-            )[:5],
-            'needs_attention': sorted(
-                creator_scores,
-                key=lambda x: x['eros_score']
-            )[:5]
+            'top_performers': [
+                creator_scores[i] for i in AgencyDashboard._top_k_indices(-scores, 5)
+            ],
+            'needs_attention': [
+                creator_scores[i] for i in AgencyDashboard._top_k_indices(scores, 5)
+            ]
         }
 
+    @staticmethod
+    def _top_k_indices(keys: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k smallest keys in ascending order (O(n) selection)"""
+
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        if len(keys) > k:
+            # Keep every key tied with the k-th smallest: argpartition picks
+            # an arbitrary subset of a tie, not the earliest positions
+            threshold = np.partition(keys, k - 1)[k - 1]
+            candidates = np.flatnonzero(keys <= threshold)
+        else:
+            candidates = np.arange(len(keys))
+
+        # Order by key, then original position, to match a stable sort
+        return candidates[np.lexsort((candidates, keys[candidates]))][:k]
+
 
 if __name__ == "__main__":
     # Test
@@ -4,18 +4,98 @@ Optimized analytics engine combining ML predictions with statistical analysis
 Designed for Claude AI orchestration with Max 20x subscription
 """
 
+import concurrent.futures
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import GradientBoostingRegressor
+import pyarrow as pa
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
-from google.cloud import bigquery
+from google.cloud import bigquery, bigquery_storage
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Price tiers in ascending order (matches the CASE in _fetch_numeric)
+PRICE_TIER_DTYPE = pd.CategoricalDtype(
+    ['free', 'budget', 'mid', 'premium', 'ultra'],
+    ordered=True
+)
+
+# Narrow column types for the historical pull (halves numeric memory).
+# earnings stays float64 because it is summed into revenue totals, and price
+# because per-hour medians are reported as-is.
+HISTORICAL_DTYPES = {
+    'view_rate': 'float32',
+    'purchase_rate': 'float32',
+    'revenue_per_send': 'float32',
+    'hour': 'int8',
+    'day_of_week': 'int8',
+    'days_old': 'int16',
+    'sent_count': 'int32'
+}
+
+# Urgency words whose earnings lift is reported in recommendation data
+URGENCY_WORDS = ('tonight', 'now', 'limited', 'exclusive', 'urgent')
+
+# Caption length buckets for recommendation data
+MESSAGE_LENGTH_EDGES = np.array([0, 50, 100, 150, 300])
+MESSAGE_LENGTH_LABELS = ['very_short', 'short', 'medium', 'long']
+
+
+def _float_or_nan(value) -> float:
+    """float() for a BigQuery aggregate that is NULL (None) when all inputs are"""
+    return float(value) if value is not None else float('nan')
+
+
+@dataclass
+class MessageArrays:
+    """
+    Contiguous NumPy columns for the hot numeric fields of the history frame.
+    Built once per analysis so reductions stream over plain arrays instead of
+    going through pandas indexing on every helper call.
+    """
+    earnings: np.ndarray
+    decay_weight: np.ndarray
+    hour: np.ndarray
+    day_of_week: np.ndarray
+    price: np.ndarray
+    view_rate: np.ndarray
+    purchase_rate: np.ndarray
+    revenue_per_send: np.ndarray
+    days_old: np.ndarray
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table, decay_tau_days: float) -> 'MessageArrays':
+        """
+        Extract the numeric columns straight from the fetched Arrow table
+        (zero-copy where a column is a single chunk without nulls).
+        """
+        def column(name: str, dtype) -> np.ndarray:
+            return np.asarray(table.column(name).to_numpy(), dtype=dtype)
+
+        # Lookback is at most a few hundred days and hours/days are tiny
+        # ranges, so narrow integer types are enough
+        days_old = column('days_old', np.int16)
+
+        return cls(
+            earnings=column('earnings', np.float64),
+            decay_weight=np.exp(days_old / np.float32(-decay_tau_days)),
+            hour=column('hour', np.int8),
+            day_of_week=column('day_of_week', np.int8),
+            price=column('price', np.float32),
+            view_rate=column('view_rate', np.float32),
+            purchase_rate=column('purchase_rate', np.float32),
+            revenue_per_send=column('revenue_per_send', np.float32),
+            days_old=days_old
+        )
+
 
 class PerformanceEngine:
     """
@@ -23,11 +103,32 @@ class PerformanceEngine:
     Claude AI will interpret results and make strategic decisions.
     """
 
-    def __init__(self, project_id: str = "of-scheduler-proj"):
+    # vault_matrix changes on the order of hours; reuse lookups within a batch
+    VAULT_CACHE_TTL_SECONDS = 3600
+    VAULT_CACHE_MAX_ENTRIES = 512
+
+    # Exponential decay time constant in days (~12.5 day half-life)
+    DECAY_TAU_DAYS = 18.0
+
+    # Rows below this decay weight (~41 days old) are excluded from model training
+    MIN_TRAINING_DECAY_WEIGHT = 0.1
+
+    def __init__(
+        self,
+        project_id: str = "of-scheduler-proj",
+        client: Optional[bigquery.Client] = None,
+        bqstorage_client: Optional[bigquery_storage.BigQueryReadClient] = None
+    ):
         self.project_id = project_id
         self.dataset_id = "eros_scheduling_brain"
-        self.client = bigquery.Client(project=project_id)
+        # Reuse a caller's clients (e.g. BatchProcessor.client and
+        # BatchProcessor.bqstorage_client) when given
+        self.client = client or bigquery.Client(project=project_id)
+        # Arrow/gRPC downloads instead of paginated REST for large result sets
+        self.bqstorage_client = bqstorage_client or bigquery_storage.BigQueryReadClient()
         self.model = None
+        self._vault_cache = {}  # lower(page_name) -> (fetched_at, content types)
+        self._vault_cache_lock = threading.Lock()
 
     def analyze_creator_comprehensive(
         self,
@@ -40,87 +141,268 @@ class PerformanceEngine:
         """
         logger.info(f"Starting comprehensive analysis for {page_name}")
 
-        # Fetch historical data
-        df = self._fetch_historical_data(page_name, lookback_days)
-
-        if df.empty:
-            logger.warning(f"No data found for {page_name}")
-            return self._empty_analysis(page_name)
-
-        # Get vault content availability (CRITICAL)
-        available_content = self._get_vault_content(page_name)
+        # The lookups are independent, so run the BigQuery round-trips
+        # concurrently (client calls release the GIL while waiting)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            # Fetch historical data: numeric columns and message text separately
+            table_future = executor.submit(self._fetch_numeric, page_name, lookback_days)
+            messages_future = executor.submit(self._fetch_messages, page_name, lookback_days)
+            # Scalar metrics are aggregated in BigQuery in a single scan
+            aggregates_future = executor.submit(self._fetch_aggregates, page_name, lookback_days)
+            # Get vault content availability (CRITICAL)
+            vault_future = executor.submit(self._get_vault_content, page_name)
+
+            table = table_future.result()
+            if table.num_rows == 0:
+                # Nothing to aggregate; don't surface errors from the other lookups
+                logger.warning(f"No data found for {page_name}")
+                return self._empty_analysis(page_name)
+
+            messages = messages_future.result()
+            aggregates = aggregates_future.result()
+            available_content = vault_future.result()
+
+        # Numeric helpers read NumPy columns off the Arrow table directly;
+        # the DataFrame is only for the pandas-based helpers
+        arrays = MessageArrays.from_arrow(table, self.DECAY_TAU_DAYS)
+        df = self._numeric_frame(table)
 
         # Perform all analytics
         analysis = {
             'page_name': page_name,
             'analysis_timestamp': datetime.now().isoformat(),
-            'data_quality': self._assess_data_quality(df),
-            'classification': self._classify_creator(df),
-            'metrics': self._calculate_core_metrics(df),
-            'timing_analysis': self._analyze_timing_patterns(df),
+            'data_quality': self._assess_data_quality(aggregates),
+            'classification': self._classify_creator(aggregates),
+            'metrics': self._calculate_core_metrics(aggregates),
+            'timing_analysis': self._analyze_timing_patterns(arrays, aggregates),
             'price_optimization': self._analyze_price_performance(df),
-            'content_analysis': self._analyze_content_types(df, available_content),
-            'ml_predictions': self._generate_ml_predictions(df),
+            'content_analysis': self._analyze_content_types(messages, available_content),
+            'ml_predictions': self._generate_ml_predictions(arrays),
             'available_content': available_content,
-            'recommendations_data': self._generate_recommendation_data(df)
+            'recommendations_data': self._generate_recommendation_data(messages)
         }
 
         return analysis
 
-    def _fetch_historical_data(
+    def analyze_creators_batch(
+        self,
+        page_names: List[str],
+        lookback_days: int = 90,
+        max_workers: int = 16
+    ) -> Dict[str, Dict]:
+        """
+        Analyze several creators concurrently, overlapping their BigQuery I/O.
+        Returns analyses keyed by page name; failures map to {'error': ...}.
+        """
+        results = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_page = {
+                executor.submit(self.analyze_creator_comprehensive, page_name, lookback_days): page_name
+                for page_name in page_names
+            }
+
+            for future in concurrent.futures.as_completed(future_to_page):
+                page_name = future_to_page[future]
+                try:
+                    results[page_name] = future.result()
+                except Exception as e:
+                    logger.error(f"Analysis failed for {page_name}: {e}")
+                    results[page_name] = {'error': str(e)}
+
+        return results
+
+    def _fetch_numeric(
+        self,
+        page_name: str,
+        lookback_days: int
+    ) -> pa.Table:
+        """
+        Fetch 90-day per-message numeric history as an Arrow table.
+        Text columns are fetched separately by _fetch_messages.
+        """
+
+        query = f"""
+        SELECT
+            price,
+            sent_count,
+            earnings,
+            message IS NOT NULL AS has_message,
+            EXTRACT(HOUR FROM sending_time) AS hour,
+            EXTRACT(DAYOFWEEK FROM sending_time) AS day_of_week,
+            DATE_DIFF(CURRENT_DATE(), DATE(sending_time), DAY) as days_old,
+            CASE
+                WHEN price = 0 THEN 'free'
+                WHEN price < 10 THEN 'budget'
+                WHEN price < 20 THEN 'mid'
+                WHEN price < 30 THEN 'premium'
+                ELSE 'ultra'
+            END AS price_tier,
+            (viewed_count / NULLIF(sent_count, 0)) * 100 as view_rate,
+            (purchased_count / NULLIF(viewed_count, 0)) * 100 as purchase_rate,
+            (earnings / NULLIF(sent_count, 0)) as revenue_per_send
+        FROM `{self.project_id}.{self.dataset_id}.mass_messages`
+        WHERE page_name = @page_name
+            AND sending_time >= DATE_SUB(CURRENT_DATE(), INTERVAL @lookback_days DAY)
+            AND sent_count > 50
+        ORDER BY sending_time DESC
+        """
+
+        job_config = self._page_lookback_job_config(page_name, lookback_days)
+
+        return self.client.query_and_wait(query, job_config=job_config).to_arrow(
+            bqstorage_client=self.bqstorage_client
+        )
+
+    def _fetch_messages(
         self,
         page_name: str,
         lookback_days: int
     ) -> pd.DataFrame:
-        """Fetch 90-day historical performance with exponential decay weighting"""
+        """Fetch message text and type with the few metrics the text helpers need"""
+
+        query = f"""
+        SELECT
+            message,
+            message_type,
+            earnings,
+            (purchased_count / NULLIF(viewed_count, 0)) * 100 as purchase_rate,
+            (earnings / NULLIF(sent_count, 0)) as revenue_per_send
+        FROM `{self.project_id}.{self.dataset_id}.mass_messages`
+        WHERE page_name = @page_name
+            AND sending_time >= DATE_SUB(CURRENT_DATE(), INTERVAL @lookback_days DAY)
+            AND sent_count > 50
+        ORDER BY sending_time DESC
+        """
+
+        job_config = self._page_lookback_job_config(page_name, lookback_days)
+
+        return self.client.query_and_wait(query, job_config=job_config).to_dataframe(
+            bqstorage_client=self.bqstorage_client,
+            dtypes={'purchase_rate': 'float32', 'revenue_per_send': 'float32'},
+            # Arrow-backed strings: no Python object per message
+            string_dtype=pd.StringDtype(storage='pyarrow')
+        )
+
+    @staticmethod
+    def _numeric_frame(table: pa.Table) -> pd.DataFrame:
+        """Convert a _fetch_numeric table to the DataFrame used by pandas helpers"""
+
+        df = table.to_pandas().astype(HISTORICAL_DTYPES)
+        df['price_tier'] = df['price_tier'].astype(PRICE_TIER_DTYPE)
+
+        return df
+
+    def _fetch_aggregates(
+        self,
+        page_name: str,
+        lookback_days: int
+    ) -> Dict:
+        """
+        Compute the scalar creator metrics in BigQuery.
+        Same filters as _fetch_numeric; returns a single row as a dict.
+        """
 
         query = f"""
         WITH base_data AS (
             SELECT
-                mm.*,
-                EXTRACT(HOUR FROM sending_time) AS hour,
-                EXTRACT(DAYOFWEEK FROM sending_time) AS day_of_week,
                 DATE(sending_time) AS send_date,
                 DATE_DIFF(CURRENT_DATE(), DATE(sending_time), DAY) as days_old,
-                CASE
-                    WHEN price = 0 THEN 'free'
-                    WHEN price < 10 THEN 'budget'
-                    WHEN price < 20 THEN 'mid'
-                    WHEN price < 30 THEN 'premium'
-                    ELSE 'ultra'
-                END AS price_tier,
+                price,
+                sent_count,
+                earnings,
                 (viewed_count / NULLIF(sent_count, 0)) * 100 as view_rate,
                 (purchased_count / NULLIF(viewed_count, 0)) * 100 as purchase_rate,
-                (earnings / NULLIF(sent_count, 0)) as revenue_per_send
-            FROM `{self.project_id}.{self.dataset_id}.mass_messages` mm
-            WHERE page_name = '{page_name}'
-                AND sending_time >= DATE_SUB(CURRENT_DATE(), INTERVAL {lookback_days} DAY)
+                (earnings / NULLIF(sent_count, 0)) as revenue_per_send,
+                EXP(-DATE_DIFF(CURRENT_DATE(), DATE(sending_time), DAY) / {self.DECAY_TAU_DAYS}) as decay_weight
+            FROM `{self.project_id}.{self.dataset_id}.mass_messages`
+            WHERE page_name = @page_name
+                AND sending_time >= DATE_SUB(CURRENT_DATE(), INTERVAL @lookback_days DAY)
                 AND sent_count > 50
+        ),
+        daily_volume AS (
+            SELECT APPROX_QUANTILES(daily_send_count, 100)[OFFSET(75)] AS q75_daily_volume
+            FROM (
+                SELECT COUNT(*) AS daily_send_count
+                FROM base_data
+                GROUP BY send_date
+            )
+        ),
+        price_median AS (
+            -- PERCENTILE_CONT is analytic-only; every row carries the same
+            -- exact (interpolated) median, NULL prices ignored
+            SELECT ANY_VALUE(median_price) AS median_price
+            FROM (
+                SELECT PERCENTILE_CONT(price, 0.5) OVER () AS median_price
+                FROM base_data
+            )
         )
         SELECT
-            *,
-            -- Exponential decay weight (14-21 day half-life)
-            EXP(-days_old / 18.0) as decay_weight
+            COUNT(*) AS total_messages,
+            MIN(send_date) AS first_send_date,
+            MAX(send_date) AS last_send_date,
+            AVG(sent_count) AS avg_sent_count,
+            COALESCE(SUM(earnings), 0) AS total_revenue,
+            COALESCE(SUM(earnings * decay_weight), 0) AS weighted_revenue,
+            COALESCE(SUM(view_rate * decay_weight), 0) / SUM(decay_weight) AS weighted_view_rate,
+            COALESCE(SUM(purchase_rate * decay_weight), 0) / SUM(decay_weight) AS weighted_purchase_rate,
+            COALESCE(SUM(revenue_per_send * decay_weight), 0) / SUM(decay_weight) AS weighted_revenue_per_send,
+            SAFE_DIVIDE(COALESCE(SUM(earnings), 0), COUNT(DISTINCT send_date)) AS avg_daily_revenue,
+            AVG(view_rate) AS avg_view_rate,
+            AVG(price) AS avg_price,
+            ANY_VALUE(price_median.median_price) AS median_price,
+            MAX(earnings) AS best_single_message_revenue,
+            COALESCE(SUM(IF(days_old <= 30, earnings, 0)), 0) AS recent_30_revenue,
+            COALESCE(SUM(IF(days_old > 30 AND days_old <= 60, earnings, 0)), 0) AS previous_30_revenue,
+            ANY_VALUE(daily_volume.q75_daily_volume) AS q75_daily_volume
         FROM base_data
-        ORDER BY sending_time DESC
+        CROSS JOIN daily_volume
+        CROSS JOIN price_median
         """
 
-        return self.client.query(query).to_dataframe()
+        job_config = self._page_lookback_job_config(page_name, lookback_days)
+        rows = list(self.client.query_and_wait(query, job_config=job_config))
+
+        return dict(rows[0].items()) if rows else {}
+
+    @staticmethod
+    def _page_lookback_job_config(
+        page_name: str,
+        lookback_days: int
+    ) -> bigquery.QueryJobConfig:
+        """Query parameters shared by the mass_messages lookback queries"""
+        return bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('page_name', 'STRING', page_name),
+            bigquery.ScalarQueryParameter('lookback_days', 'INT64', lookback_days)
+        ])
 
     def _get_vault_content(self, page_name: str) -> List[str]:
         """
         CRITICAL: Get available content from vault_matrix.
         Must ALWAYS be checked before caption assignment.
+        Results are cached per page for VAULT_CACHE_TTL_SECONDS.
         """
 
+        cache_key = page_name.lower()
+        cached = self._vault_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.VAULT_CACHE_TTL_SECONDS:
+            return list(cached[1])
+
         query = f"""
         SELECT *
         FROM `{self.project_id}.{self.dataset_id}.vault_matrix`
-        WHERE LOWER(page_name) = LOWER('{page_name}')
+        WHERE LOWER(page_name) = LOWER(@page_name)
         """
 
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('page_name', 'STRING', page_name)
+        ])
+
         try:
-            df = self.client.query(query).to_dataframe()
+            df = self.client.query_and_wait(query, job_config=job_config).to_dataframe(
+                bqstorage_client=self.bqstorage_client
+            )
+            available = []
             if not df.empty:
                 # Return list of content types where value is TRUE
                 available = [
@@ -128,19 +410,25 @@ class PerformanceEngine:
                     if col != 'page_name' and df[col].iloc[0] == True
                 ]
                 logger.info(f"Available content for {page_name}: {available}")
-                return available
+
+            with self._vault_cache_lock:
+                if len(self._vault_cache) >= self.VAULT_CACHE_MAX_ENTRIES:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    self._vault_cache.pop(next(iter(self._vault_cache)))
+                self._vault_cache[cache_key] = (time.monotonic(), available)
+            return list(available)
         except Exception as e:
             logger.error(f"Failed to fetch vault matrix: {e}")
 
         return []
 
-    def _assess_data_quality(self, df: pd.DataFrame) -> Dict:
+    def _assess_data_quality(self, aggregates: Dict) -> Dict:
         """Assess data quality for confidence scoring"""
 
-        total_messages = len(df)
-        days_span = (df['send_date'].max() - df['send_date'].min()).days
-        avg_sent_count = df['sent_count'].mean()
-        days_since_last = (datetime.now().date() - df['send_date'].max()).days
+        total_messages = aggregates['total_messages']
+        days_span = (aggregates['last_send_date'] - aggregates['first_send_date']).days
+        avg_sent_count = aggregates['avg_sent_count']
+        days_since_last = (datetime.now().date() - aggregates['last_send_date']).days
 
         # Calculate quality score (0-100)
         volume_score = min(total_messages / 100, 1.0) * 40
@@ -158,10 +446,10 @@ class PerformanceEngine:
             'confidence_level': 'high' if quality_score > 75 else 'medium' if quality_score > 50 else 'low'
         }
 
-    def _classify_creator(self, df: pd.DataFrame) -> Dict:
+    def _classify_creator(self, aggregates: Dict) -> Dict:
         """Classify creator tier, health, and saturation status"""
 
-        avg_sent_count = df['sent_count'].mean()
+        avg_sent_count = aggregates['avg_sent_count']
 
         # Tier classification
         if avg_sent_count >= 5000:
@@ -178,8 +466,8 @@ class PerformanceEngine:
             saturation_threshold = 45
 
         # Health status (revenue trend last 30 vs 60 days)
-        recent_30 = df[df['days_old'] <= 30]['earnings'].sum()
-        previous_30 = df[(df['days_old'] > 30) & (df['days_old'] <= 60)]['earnings'].sum()
+        recent_30 = aggregates['recent_30_revenue']
+        previous_30 = aggregates['previous_30_revenue']
 
         if previous_30 > 0:
             growth_rate = ((recent_30 - previous_30) / previous_30) * 100
@@ -197,7 +485,7 @@ class PerformanceEngine:
             health_multiplier = 1.0
 
         # Saturation status
-        avg_view_rate = df['view_rate'].mean()
+        avg_view_rate = aggregates['avg_view_rate']
 
         if avg_view_rate < saturation_threshold:
             saturation = 'OVERSATURATED'
@@ -221,82 +509,128 @@ class PerformanceEngine:
             'saturation_threshold': saturation_threshold
         }
 
-    def _calculate_core_metrics(self, df: pd.DataFrame) -> Dict:
-        """Calculate weighted core performance metrics"""
-
-        # Apply decay weights to recent data
-        weighted_earnings = (df['earnings'] * df['decay_weight']).sum()
-        weighted_view_rate = (df['view_rate'] * df['decay_weight']).sum() / df['decay_weight'].sum()
-        weighted_purchase_rate = (df['purchase_rate'] * df['decay_weight']).sum() / df['decay_weight'].sum()
-        weighted_rps = (df['revenue_per_send'] * df['decay_weight']).sum() / df['decay_weight'].sum()
+    def _calculate_core_metrics(self, aggregates: Dict) -> Dict:
+        """Weighted core performance metrics (decay weighting done in SQL)"""
 
         return {
-            'total_revenue_90d': float(df['earnings'].sum()),
-            'weighted_revenue': float(weighted_earnings),
-            'avg_daily_revenue': float(df.groupby('send_date')['earnings'].sum().mean()),
-            'avg_view_rate': float(weighted_view_rate),
-            'avg_purchase_rate': float(weighted_purchase_rate),
-            'avg_revenue_per_send': float(weighted_rps),
-            'total_messages_sent': len(df),
-            'avg_price': float(df['price'].mean()),
-            'median_price': float(df['price'].median()),
-            'best_single_message_revenue': float(df['earnings'].max())
+            'total_revenue_90d': float(aggregates['total_revenue']),
+            'weighted_revenue': float(aggregates['weighted_revenue']),
+            'avg_daily_revenue': float(aggregates['avg_daily_revenue'] or 0),
+            'avg_view_rate': float(aggregates['weighted_view_rate']),
+            'avg_purchase_rate': float(aggregates['weighted_purchase_rate']),
+            'avg_revenue_per_send': float(aggregates['weighted_revenue_per_send']),
+            'total_messages_sent': aggregates['total_messages'],
+            'avg_price': _float_or_nan(aggregates['avg_price']),
+            'median_price': _float_or_nan(aggregates['median_price']),
+            'best_single_message_revenue': _float_or_nan(aggregates['best_single_message_revenue'])
         }
 
-    def _analyze_timing_patterns(self, df: pd.DataFrame) -> Dict:
+    def _analyze_timing_patterns(
+        self,
+        arrays: MessageArrays,
+        aggregates: Dict
+    ) -> Dict:
         """Analyze timing patterns with weighted metrics"""
 
-        # Hourly analysis with decay weights
-        hourly = df.groupby('hour').agg({
-            'earnings': lambda x: (x * df.loc[x.index, 'decay_weight']).sum(),
-            'revenue_per_send': lambda x: (x * df.loc[x.index, 'decay_weight']).mean(),
-            'view_rate': 'mean',
-            'purchase_rate': 'mean'
-        }).round(2)
+        # Hourly analysis with decay weights, one bincount pass per column
+        hour_counts = np.bincount(arrays.hour, minlength=24)
+        observed_hours = np.flatnonzero(hour_counts)
+        hourly = pd.DataFrame({
+            'earnings': np.bincount(
+                arrays.hour, weights=arrays.earnings * arrays.decay_weight, minlength=24
+            ),
+            'revenue_per_send': self._bincount_mean(
+                arrays.hour, arrays.revenue_per_send * arrays.decay_weight, 24
+            ),
+            'view_rate': self._bincount_mean(arrays.hour, arrays.view_rate, 24),
+            'purchase_rate': self._bincount_mean(arrays.hour, arrays.purchase_rate, 24)
+        }).iloc[observed_hours].round(2)
 
         # Identify prime hours (top 75th percentile by weighted revenue)
-        revenue_threshold = hourly['earnings'].quantile(0.75)
-        prime_hours = hourly[hourly['earnings'] >= revenue_threshold].index.tolist()
-
-        # Day of week analysis
-        dow_performance = df.groupby('day_of_week').agg({
-            'earnings': 'sum',
-            'view_rate': 'mean',
-            'purchase_rate': 'mean'
-        }).round(2).to_dict('index')
+        hourly_revenue = hourly['earnings'].to_numpy()
+        revenue_threshold = self._partition_quantile(hourly_revenue, 0.75)
+        prime_hours = observed_hours[np.flatnonzero(hourly_revenue >= revenue_threshold)].tolist()
+
+        # Day of week analysis (BigQuery DAYOFWEEK is 1-7)
+        observed_days = np.flatnonzero(np.bincount(arrays.day_of_week, minlength=8))
+        dow_performance = pd.DataFrame({
+            'earnings': np.bincount(arrays.day_of_week, weights=arrays.earnings, minlength=8),
+            'view_rate': self._bincount_mean(arrays.day_of_week, arrays.view_rate, 8),
+            'purchase_rate': self._bincount_mean(arrays.day_of_week, arrays.purchase_rate, 8)
+        }).iloc[observed_days].round(2).to_dict('index')
 
         return {
             'prime_hours': prime_hours,
             'hourly_revenue': hourly['earnings'].to_dict(),
             'hourly_rps': hourly['revenue_per_send'].to_dict(),
             'day_of_week_performance': dow_performance,
-            'optimal_daily_volume': int(df.groupby('send_date').size().quantile(0.75))
+            'optimal_daily_volume': int(aggregates.get('q75_daily_volume') or 0)
         }
 
+    @staticmethod
+    def _partition_quantile(values: np.ndarray, q: float) -> float:
+        """
+        Linearly interpolated quantile (same as np.quantile's default) using
+        an O(n) partial partition instead of a full sort.
+        """
+        position = q * (len(values) - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, len(values) - 1)
+        partitioned = np.partition(values, [lower, upper])
+        return float(
+            partitioned[lower] + (partitioned[upper] - partitioned[lower]) * (position - lower)
+        )
+
+    @staticmethod
+    def _bincount_mean(
+        keys: np.ndarray,
+        values: np.ndarray,
+        minlength: int
+    ) -> np.ndarray:
+        """Per-key mean of values, skipping NaNs like pandas groupby().mean()"""
+        valid = ~np.isnan(values)
+        sums = np.bincount(keys, weights=np.where(valid, values, 0.0), minlength=minlength)
+        counts = np.bincount(keys, weights=valid, minlength=minlength)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return sums / counts
+
     def _analyze_price_performance(self, df: pd.DataFrame) -> Dict:
         """Optimize pricing strategy (focus on revenue per send, not conversion)"""
 
-        price_tier_analysis = df.groupby('price_tier').agg({
-            'earnings': 'sum',
-            'revenue_per_send': 'mean',
-            'purchase_rate': 'mean',
-            'view_rate': 'mean',
-            'message': 'count'
+        price_tier_analysis = df.groupby('price_tier', observed=True).agg(
+            earnings=('earnings', 'sum'),
+            revenue_per_send=('revenue_per_send', 'mean'),
+            purchase_rate=('purchase_rate', 'mean'),
+            view_rate=('view_rate', 'mean'),
+            message=('has_message', 'sum')  # non-null messages, as count did
+        )
+        # Means of the float32 rate columns are float32; widen them so the
+        # rounded values come out clean in the report dict
+        price_tier_analysis = price_tier_analysis.astype({
+            'revenue_per_send': 'float64',
+            'purchase_rate': 'float64',
+            'view_rate': 'float64'
         }).round(2)
 
         # Find sweet spot (highest RPS)
         best_tier = price_tier_analysis['revenue_per_send'].idxmax()
 
         # Price elasticity by hour
-        hourly_pricing = {}
-        for hour in df['hour'].unique():
-            hour_df = df[df['hour'] == hour]
-            if len(hour_df) > 5:
-                hourly_pricing[int(hour)] = {
-                    'optimal_price': float(hour_df[hour_df['earnings'] > 0]['price'].median()),
-                    'avg_rps': float(hour_df['revenue_per_send'].mean()),
-                    'best_tier': hour_df.groupby('price_tier')['revenue_per_send'].mean().idxmax()
-                }
+        hour_counts = df.groupby('hour').size()
+        hours = hour_counts.index[hour_counts > 5]
+        tier_rps = df.groupby(['hour', 'price_tier'], observed=True)['revenue_per_send'].mean()
+        best_tiers = tier_rps.unstack('price_tier').loc[hours].idxmax(axis=1)
+        optimal_prices = df[df['earnings'] > 0].groupby('hour')['price'].median().reindex(hours)
+        avg_rps = df.groupby('hour')['revenue_per_send'].mean().loc[hours]
+
+        hourly_pricing = {
+            int(hour): {
+                'optimal_price': float(optimal_prices[hour]),
+                'avg_rps': float(avg_rps[hour]),
+                'best_tier': best_tiers[hour]
+            }
+            for hour in hours
+        }
 
         return {
             'tier_performance': price_tier_analysis.to_dict('index'),
@@ -334,48 +668,66 @@ class PerformanceEngine:
 
         return content_analysis
 
-    def _generate_ml_predictions(self, df: pd.DataFrame) -> Dict:
+    def _generate_ml_predictions(self, arrays: MessageArrays) -> Dict:
         """Generate ML-based revenue predictions"""
 
         try:
-            # Prepare features
-            X = pd.DataFrame()
-            X['hour'] = df['hour']
-            X['day_of_week'] = df['day_of_week']
-            X['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-            X['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-            X['price'] = df['price']
-            X['price_squared'] = df['price'] ** 2
-            X['is_free'] = (df['price'] == 0).astype(int)
-            X['avg_hour_revenue'] = df.groupby('hour')['earnings'].transform('mean')
-
-            y = df['earnings']
+            # Prepare features, filling a preallocated float32 matrix (the
+            # dtype the histogram booster bins from). Hour and day of week are
+            # categorical, so no cyclic encoding or per-hour target mean.
+            feature_names = ['hour', 'day_of_week', 'price', 'price_squared', 'is_free']
+            X = np.empty((len(arrays.hour), len(feature_names)), dtype=np.float32)
+            X[:, 0] = arrays.hour
+            X[:, 1] = arrays.day_of_week
+            X[:, 2] = arrays.price
+            X[:, 3] = arrays.price * arrays.price
+            X[:, 4] = arrays.price == 0
+
+            y = arrays.earnings
+            weights = arrays.decay_weight
+
+            # Rows older than ~6 weeks carry little decay weight; leave them out
+            recent = weights > self.MIN_TRAINING_DECAY_WEIGHT
+            X, y, weights = X[recent], y[recent], weights[recent]
 
             if len(X) < 30:
                 return {'error': 'Insufficient data for ML predictions'}
 
             # Train model
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
+            X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
+                X, y, weights, test_size=0.2, random_state=42
             )
 
-            model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-            model.fit(X_train, y_train)
+            # Histogram-binned boosting; early stopping carves its own
+            # validation split out of the training rows. Hour and day of
+            # week are split on natively as categoricals.
+            model = HistGradientBoostingRegressor(
+                max_iter=100,
+                early_stopping=True,
+                validation_fraction=0.2,
+                categorical_features=[0, 1],
+                random_state=42
+            )
+            model.fit(X_train, y_train, sample_weight=w_train)
 
-            # Feature importance
+            # Feature importance (no split-gain importances on hist models)
+            importances = permutation_importance(
+                model, X_test, y_test, n_repeats=5, random_state=42,
+                sample_weight=w_test
+            )
             feature_importance = pd.DataFrame({
-                'feature': X.columns,
-                'importance': model.feature_importances_
+                'feature': feature_names,
+                'importance': importances.importances_mean
             }).sort_values('importance', ascending=False)
 
             # Test accuracy
-            train_score = model.score(X_train, y_train)
-            test_score = model.score(X_test, y_test)
+            train_score = model.score(X_train, y_train, sample_weight=w_train)
+            test_score = model.score(X_test, y_test, sample_weight=w_test)
 
             self.model = model  # Store for later use
 
             return {
-                'model_type': 'GradientBoostingRegressor',
+                'model_type': 'HistGradientBoostingRegressor',
                 'train_accuracy': round(train_score * 100, 1),
                 'test_accuracy': round(test_score * 100, 1),
                 'feature_importance': feature_importance.head(5).to_dict('records'),
@@ -390,28 +742,54 @@ class PerformanceEngine:
         """Generate data for Claude AI to create recommendations"""
 
         # Identify patterns for Claude to interpret
-        urgency_words = ['tonight', 'now', 'limited', 'exclusive', 'urgent']
         urgency_performance = []
 
-        for word in urgency_words:
-            if 'message' in df.columns:
-                has_word = df['message'].str.lower().str.contains(word, na=False)
-                if has_word.sum() > 3:
-                    avg_earnings = df[has_word]['earnings'].mean()
-                    baseline = df[~has_word]['earnings'].mean()
-                    if baseline > 0:
-                        lift = ((avg_earnings - baseline) / baseline) * 100
-                        urgency_performance.append({
-                            'word': word,
-                            'lift_pct': round(lift, 1),
-                            'sample_size': int(has_word.sum())
-                        })
+        if 'message' in df.columns:
+            # Case-insensitive substring kernels on the Arrow buffers (RE2 in
+            # pyarrow), so no lowercased copy of the column is materialised
+            has_word = np.column_stack([
+                df['message'].str.contains(word, case=False, na=False, regex=False).to_numpy(dtype=bool)
+                for word in URGENCY_WORDS
+            ])
+
+            # All lifts in one pass: per-word sums/counts with and without
+            earnings = df['earnings'].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(earnings)
+            earnings = np.where(valid, earnings, 0.0)
+            word_matrix = has_word.astype(np.float64)
+            sample_sizes = has_word.sum(axis=0)
+            sum_with = earnings @ word_matrix
+            count_with = valid @ word_matrix
+            sum_without = earnings.sum() - sum_with
+            count_without = valid.sum() - count_with
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                avg_with = sum_with / count_with
+                baselines = sum_without / count_without
+
+            for i, word in enumerate(URGENCY_WORDS):
+                if sample_sizes[i] > 3 and baselines[i] > 0:
+                    lift = ((avg_with[i] - baselines[i]) / baselines[i]) * 100
+                    urgency_performance.append({
+                        'word': word,
+                        'lift_pct': round(float(lift), 1),
+                        'sample_size': int(sample_sizes[i])
+                    })
 
         # Message length analysis
         if 'message' in df.columns:
-            df['message_length'] = df['message'].str.len()
-            length_bins = pd.cut(df['message_length'], bins=[0, 50, 100, 150, 300], labels=['very_short', 'short', 'medium', 'long'])
-            length_performance = df.groupby(length_bins)['revenue_per_send'].mean().to_dict()
+            # Right-closed bins (0, 50], (50, 100], ...; ids 0 and 5 fall outside
+            lengths = df['message'].str.len().to_numpy(dtype=np.float64, na_value=0)
+            bin_ids = np.searchsorted(MESSAGE_LENGTH_EDGES, lengths)
+            bin_means = self._bincount_mean(
+                bin_ids,
+                df['revenue_per_send'].to_numpy(dtype=np.float64, na_value=np.nan),
+                len(MESSAGE_LENGTH_EDGES) + 1
+            )
+            length_performance = {
+                label: float(mean)
+                for label, mean in zip(MESSAGE_LENGTH_LABELS, bin_means[1:])
+            }
         else:
             length_performance = {}
 
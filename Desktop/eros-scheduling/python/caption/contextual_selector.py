@@ -3,16 +3,136 @@ Contextual Caption Selector with Energy Matching
 Selects captions based on time-of-day energy, content availability, and performance
 """
 
-import pandas as pd
 import numpy as np
+import re
+from google.api_core import exceptions as api_exceptions
 from google.cloud import bigquery
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Time periods with a precomputed energy score column in caption_energy_scores
+TIME_PERIODS = ('morning', 'afternoon', 'evening', 'late_night')
+
+# Declared schema of caption_energy_scores (sql/infrastructure/tables.sql);
+# passed to the refresh load so WRITE_TRUNCATE can't swap in an autodetected one
+ENERGY_SCORES_SCHEMA = (
+    bigquery.SchemaField('caption_id', 'INT64', mode='REQUIRED'),
+    *(bigquery.SchemaField(f'{period}_score', 'FLOAT64') for period in TIME_PERIODS)
+)
+
+
+# Regex metacharacters to escape for BigQuery's RE2 (which, unlike Python's
+# re.escape output, rejects escaped spaces)
+_RE2_SPECIAL = re.compile(r'([\\.^$|?*+()\[\]{}])')
+
+# LIKE wildcards as RE2 (neither character is an RE2 metacharacter, so they
+# survive escaping and are translated afterwards)
+_LIKE_WILDCARDS = str.maketrans({'%': '.*', '_': '.'})
+
+
+def _like_term_to_re2(term: str) -> str:
+    """RE2 pattern matching where LIKE CONCAT('%', term, '%') would"""
+    return _RE2_SPECIAL.sub(r'\\\1', term.lower()).translate(_LIKE_WILDCARDS)
+
+
+@lru_cache(maxsize=64)
+def _message_type_pattern(message_type: str) -> re.Pattern:
+    """Compiled content_category matcher for a message type, built once per type"""
+    return re.compile(message_type.replace('_', '|'))
+
+
+def _factorize(values: List[Optional[str]]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Integer codes into the distinct values (in first-seen order); None is -1"""
+    code_of = {}
+    codes = np.fromiter(
+        (-1 if value is None else code_of.setdefault(value, len(code_of)) for value in values),
+        dtype=np.int32,
+        count=len(values)
+    )
+    return codes, tuple(code_of)
+
+
+@dataclass
+class CaptionCandidates:
+    """
+    Column arrays for the fetched caption pool.
+    Numeric fields are NumPy arrays for vectorised scoring; text fields stay
+    as Python lists since they are only read for the winning caption.
+    Low-cardinality price_tier and content_category are also held as integer
+    codes so slot filters are evaluated per distinct value, not per caption.
+    energy_scores holds the stored score per time period (NaN where the
+    caption has not been scored yet).
+    """
+    caption_id: np.ndarray
+    caption_text: List[Optional[str]]
+    caption_text_lower: np.ndarray
+    content_category: List[Optional[str]]
+    content_category_codes: np.ndarray
+    content_categories_lower: Tuple[str, ...]
+    price_tier_codes: np.ndarray
+    price_tiers: Tuple[str, ...]
+    overall_performance_score: np.ndarray
+    avg_conversion_rate: np.ndarray
+    lifetime_revenue: np.ndarray
+    days_since_used_by_creator: np.ndarray
+    energy_scores: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_rows(cls, rows: List) -> 'CaptionCandidates':
+        """Build from BigQuery rows of the _fetch_available_captions query"""
+        def numeric(name: str) -> np.ndarray:
+            # NULLs become NaN
+            return np.array([row[name] for row in rows], dtype=np.float64)
+
+        caption_text = [row['caption_text'] for row in rows]
+        content_category = [row['content_category'] for row in rows]
+        # Lowercased once for message_type matching; missing stays None (-1)
+        content_category_codes, content_categories_lower = _factorize([
+            category.lower() if isinstance(category, str) else None
+            for category in content_category
+        ])
+        price_tier_codes, price_tiers = _factorize([row['price_tier'] for row in rows])
+
+        return cls(
+            caption_id=np.fromiter(
+                (row['caption_id'] for row in rows), dtype=np.int64, count=len(rows)
+            ),
+            caption_text=caption_text,
+            # Lowercased once for keyword scans; missing text scans as ''
+            caption_text_lower=np.array(
+                [text.lower() if isinstance(text, str) else '' for text in caption_text],
+                dtype=str
+            ),
+            content_category=content_category,
+            content_category_codes=content_category_codes,
+            content_categories_lower=content_categories_lower,
+            price_tier_codes=price_tier_codes,
+            price_tiers=price_tiers,
+            overall_performance_score=numeric('overall_performance_score'),
+            avg_conversion_rate=numeric('avg_conversion_rate'),
+            lifetime_revenue=numeric('lifetime_revenue'),
+            days_since_used_by_creator=numeric('days_since_used_by_creator'),
+            energy_scores={period: numeric(f'{period}_score') for period in TIME_PERIODS}
+        )
+
+    def __len__(self) -> int:
+        return len(self.caption_id)
+
+    def price_tier_at(self, index: int) -> Optional[str]:
+        """Decoded price_tier of one caption (None when missing)"""
+        code = self.price_tier_codes[index]
+        return self.price_tiers[code] if code >= 0 else None
+
 
 class ContextualCaptionSelector:
     """
@@ -23,10 +143,38 @@ class ContextualCaptionSelector:
     - Diversity enforcement
     """
 
-    def __init__(self, project_id: str = "of-scheduler-proj"):
+    # Time period for each hour of the day (morning 5-11, afternoon 12-16,
+    # evening 17-21, late_night 22-4)
+    HOUR_TO_PERIOD = (
+        ('late_night',) * 5 + ('morning',) * 7 + ('afternoon',) * 5 +
+        ('evening',) * 5 + ('late_night',) * 2
+    )
+
+    # Caption pools are reused across schedules generated within a batch
+    CAPTION_CACHE_TTL_SECONDS = 300
+    CAPTION_CACHE_MAX_ENTRIES = 256
+
+    # Energy terms for an unknown time period: base score only
+    _NO_ENERGY_TERMS = MappingProxyType({
+        'keywords': (), 'keyword_weight': 0.0, 'tones': (), 'tone_weight': 0.0
+    })
+
+    def __init__(
+        self,
+        project_id: str = "of-scheduler-proj",
+        seed: Optional[int] = None,
+        client: Optional[bigquery.Client] = None
+    ):
         self.project_id = project_id
         self.dataset_id = "eros_scheduling_brain"
-        self.client = bigquery.Client(project=project_id)
+        # Reuse a caller's client (e.g. BatchProcessor.client) when given
+        self.client = client or bigquery.Client(project=project_id)
+        self._rng = np.random.default_rng(seed)  # score jitter; pass a seed for reproducible picks
+        self._caption_cache = {}  # (page, content, excluded ids) -> (fetched_at, captions)
+        self._caption_cache_lock = threading.Lock()
+        # Cleared if caption_energy_scores isn't deployed yet; captions are
+        # then scored on the fly until a refresh creates it
+        self._energy_scores_table = True
 
         # Energy profiles by time of day
         self.energy_profiles = {
@@ -56,6 +204,18 @@ class ContextualCaptionSelector:
             }
         }
 
+        # Energy-match terms per period, frozen once: lowercased match words
+        # and the per-match score weights (0.3 keywords, 0.2 tone in total)
+        self._energy_terms = {
+            period: {
+                'keywords': tuple(kw.lower() for kw in profile['keywords']),
+                'keyword_weight': 0.3 / max(len(profile['keywords']), 1),
+                'tones': tuple(tone.lower() for tone in profile['tone']),
+                'tone_weight': 0.2 / max(len(profile['tone']), 1)
+            }
+            for period, profile in self.energy_profiles.items()
+        }
+
     def select_captions_for_schedule(
         self,
         page_name: str,
@@ -78,26 +238,54 @@ class ContextualCaptionSelector:
             recently_used_caption_ids
         )
 
-        if captions.empty:
+        if len(captions) == 0:
             logger.warning(f"No captions available for {page_name}")
             return []
 
         # Select captions for each slot
         selected = []
-        used_ids = set()
+        used_mask = np.zeros(len(captions), dtype=bool)  # captions already placed
+        energy_by_period = {}  # time_period -> energy scores for every caption
+
+        # Slot-independent score terms, computed once per schedule
+        base_scores, freshness_boost = self._static_scores(captions)
+
+        # Candidate masks for each slot filter, built once per schedule
+        tier_masks = {
+            price_tier: self._code_mask(
+                captions.price_tier_codes,
+                [tier == price_tier for tier in captions.price_tiers]
+            )
+            for price_tier in {slot[2] for slot in time_slots}
+            if price_tier != 'free'
+        }
+        category_masks = {
+            message_type: self._category_mask(captions, message_type)
+            for message_type in {slot[1] for slot in time_slots}
+            if message_type != 'general_ppv'
+        }
 
         for hour, message_type, price_tier in time_slots:
             # Get time period
             time_period = self._get_time_period(hour)
+            if time_period not in energy_by_period:
+                energy_by_period[time_period] = self._period_energy_scores(
+                    captions,
+                    time_period
+                )
 
             # Select best caption for this slot
             caption = self._select_best_caption(
                 captions,
                 hour,
                 message_type,
-                price_tier,
                 time_period,
-                used_ids
+                used_mask,
+                energy_by_period[time_period],
+                base_scores,
+                freshness_boost,
+                tier_masks.get(price_tier),
+                category_masks.get(message_type)
             )
 
             if caption is not None:
@@ -111,7 +299,6 @@ class ContextualCaptionSelector:
                     'energy_match_score': caption['energy_match_score'],
                     'selection_reason': caption['selection_reason']
                 })
-                used_ids.add(caption['caption_id'])
 
         return selected
 
@@ -120,35 +307,94 @@ class ContextualCaptionSelector:
         page_name: str,
         available_content: List[str],
         exclude_ids: List[int]
-    ) -> pd.DataFrame:
+    ) -> CaptionCandidates:
         """
         Fetch available captions filtered by vault_matrix.
         CRITICAL: Only return captions creator has content for.
+        Results are cached for CAPTION_CACHE_TTL_SECONDS per distinct request.
         """
 
-        # Build content filter based on vault_matrix
-        content_conditions = []
-        for content_type in available_content:
-            # Match various naming conventions
-            content_conditions.append(
-                f"LOWER(cb.content_category) LIKE '%{content_type.lower()}%'"
-            )
+        cache_key = (
+            page_name,
+            tuple(sorted({c.lower() for c in available_content})),
+            tuple(sorted(set(exclude_ids)))
+        )
+        cached = self._caption_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.CAPTION_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        # Content types are matched as one alternation of their former LIKE
+        # patterns; an empty pattern means no content filter
+        content_regex = '|'.join(_like_term_to_re2(c) for c in available_content)
+
+        # Content and exclusion lists go in as parameters so the query text
+        # is identical across creators and calls (plan/result caching)
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("page_name", "STRING", page_name),
+            bigquery.ScalarQueryParameter("content_regex", "STRING", content_regex),
+            bigquery.ArrayQueryParameter("exclude_ids", "INT64", list(exclude_ids))
+        ])
+
+        # At most 1000 rows: plain result pages beat a DataFrame download
+        try:
+            try:
+                rows = list(self.client.query(
+                    self._caption_query(self._energy_scores_table),
+                    job_config=job_config
+                ).result())
+            except api_exceptions.NotFound as e:
+                if not self._energy_scores_table or 'caption_energy_scores' not in str(e):
+                    raise
+                logger.warning(
+                    "caption_energy_scores not found; scoring captions on the fly "
+                    "until refresh_caption_energy_scores creates it"
+                )
+                self._energy_scores_table = False
+                rows = list(self.client.query(
+                    self._caption_query(False),
+                    job_config=job_config
+                ).result())
+        except Exception as e:
+            logger.error(f"Failed to fetch captions: {e}")
+            return CaptionCandidates.from_rows([])
 
-        content_filter = " OR ".join(content_conditions) if content_conditions else "1=1"
+        captions = CaptionCandidates.from_rows(rows)
 
-        # Build exclusion filter
-        exclude_filter = ""
-        if exclude_ids:
-            exclude_filter = f"AND cb.caption_id NOT IN ({','.join(map(str, exclude_ids))})"
+        with self._caption_cache_lock:
+            if len(self._caption_cache) >= self.CAPTION_CACHE_MAX_ENTRIES:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._caption_cache.pop(next(iter(self._caption_cache)))
+            self._caption_cache[cache_key] = (time.monotonic(), captions)
 
-        query = f"""
+        return captions
+
+    def _caption_query(self, with_energy_scores: bool) -> str:
+        """
+        Candidate caption SQL for _fetch_available_captions. Without the
+        energy scores table every score column is NULL, which selection
+        treats like a caption missing from the table.
+        """
+
+        if with_energy_scores:
+            energy_columns = ',\n            '.join(f'es.{period}_score' for period in TIME_PERIODS)
+            energy_join = (
+                f"LEFT JOIN `{self.project_id}.{self.dataset_id}.caption_energy_scores` es\n"
+                "            ON cb.caption_id = es.caption_id"
+            )
+        else:
+            energy_columns = ',\n            '.join(
+                f'CAST(NULL AS FLOAT64) AS {period}_score' for period in TIME_PERIODS
+            )
+            energy_join = ''
+
+        return f"""
         WITH recent_usage AS (
             SELECT
                 caption_id,
                 MAX(scheduled_send_date) as last_used,
                 COUNT(*) as times_used
             FROM `{self.project_id}.{self.dataset_id}.active_caption_assignments`
-            WHERE page_name = '{page_name}'
+            WHERE page_name = @page_name
                 AND scheduled_send_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 60 DAY)
             GROUP BY caption_id
         )
@@ -164,108 +410,147 @@ class ContextualCaptionSelector:
             cb.overall_performance_score,
             cb.days_since_last_use,
             COALESCE(ru.times_used, 0) as recent_uses,
-            COALESCE(DATE_DIFF(CURRENT_DATE(), ru.last_used, DAY), 999) as days_since_used_by_creator
+            COALESCE(DATE_DIFF(CURRENT_DATE(), ru.last_used, DAY), 999) as days_since_used_by_creator,
+            {energy_columns}
         FROM `{self.project_id}.{self.dataset_id}.caption_bank` cb
         LEFT JOIN recent_usage ru ON cb.caption_id = ru.caption_id
+        {energy_join}
         WHERE cb.usage_status = 'available'
             AND cb.validation_level IN ('medium', 'high')
-            AND ({content_filter})
+            -- Substring match per content type, with LIKE's % and _ wildcards
+            -- carried over; no content list means no filter
+            AND (
+                @content_regex = ''
+                OR REGEXP_CONTAINS(LOWER(cb.content_category), @content_regex)
+            )
             AND cb.days_since_last_use > 30  -- Global freshness
-            {exclude_filter}
+            AND cb.caption_id NOT IN UNNEST(@exclude_ids)
         ORDER BY
             cb.overall_performance_score DESC,
             cb.lifetime_revenue DESC
         LIMIT 1000
         """
 
-        try:
-            return self.client.query(query).to_dataframe()
-        except Exception as e:
-            logger.error(f"Failed to fetch captions: {e}")
-            return pd.DataFrame()
+    @staticmethod
+    def _static_scores(captions: CaptionCandidates) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score terms that don't depend on the slot: the performance/conversion
+        part of the final score and the 1.2x boost for captions this creator
+        hasn't used in 45+ days.
+        """
+        base_scores = (
+            (captions.overall_performance_score / 100) * 0.4 +
+            (captions.avg_conversion_rate / 100) * 0.3
+        )
+        freshness_boost = np.where(captions.days_since_used_by_creator > 45, 1.2, 1.0)
+
+        return base_scores, freshness_boost
+
+    @staticmethod
+    def _code_mask(codes: np.ndarray, category_matches: List[bool]) -> np.ndarray:
+        """
+        Expand per-category matches to a per-caption mask; missing values
+        (code -1) pick up the trailing False.
+        """
+        return np.array(category_matches + [False], dtype=bool)[codes]
+
+    @classmethod
+    def _category_mask(cls, captions: CaptionCandidates, message_type: str) -> np.ndarray:
+        """
+        Captions whose lowercased content_category matches any part of
+        message_type (e.g. 'boy_girl' matches 'boy' or 'girl').
+        """
+        search = _message_type_pattern(message_type).search
+        return cls._code_mask(
+            captions.content_category_codes,
+            [search(category) is not None for category in captions.content_categories_lower]
+        )
 
     def _get_time_period(self, hour: int) -> str:
         """Map hour to time period"""
-        if 5 <= hour < 12:
-            return 'morning'
-        elif 12 <= hour < 17:
-            return 'afternoon'
-        elif 17 <= hour < 22:
-            return 'evening'
-        else:
-            return 'late_night'
+        if 0 <= hour < 24:
+            return self.HOUR_TO_PERIOD[hour]
+        return 'late_night'
 
     def _select_best_caption(
         self,
-        captions: pd.DataFrame,
+        captions: CaptionCandidates,
         hour: int,
         message_type: str,
-        price_tier: str,
         time_period: str,
-        used_ids: set
+        used_mask: np.ndarray,
+        energy_scores: np.ndarray,
+        base_scores: np.ndarray,
+        freshness_boost: np.ndarray,
+        tier_mask: Optional[np.ndarray] = None,
+        category_mask: Optional[np.ndarray] = None
     ) -> Optional[Dict]:
-        """Select best caption for a specific slot"""
+        """
+        Select best caption for a specific slot.
+        energy_scores holds the time_period energy match for every caption and
+        base_scores/freshness_boost come from _static_scores; tier_mask and
+        category_mask mark the slot's preferred captions (None for free tier
+        or general_ppv, which don't filter). The chosen caption is marked in
+        used_mask so later slots skip it.
+        """
 
         # Filter out already used
-        available = captions[~captions['caption_id'].isin(used_ids)].copy()
+        mask = ~used_mask
 
-        if available.empty:
+        if not mask.any():
             return None
 
         # Filter by price tier (if not free)
-        if price_tier != 'free':
-            tier_match = available[available['price_tier'] == price_tier]
-            if not tier_match.empty:
-                available = tier_match
+        if tier_mask is not None:
+            tier_match = mask & tier_mask
+            if tier_match.any():
+                mask = tier_match
 
         # Filter by content category if specific
-        if message_type != 'general_ppv':
-            content_match = available[
-                available['content_category'].str.lower().str.contains(
-                    message_type.replace('_', '|'),
-                    na=False,
-                    regex=True
-                )
-            ]
-            if not content_match.empty:
-                available = content_match
+        if category_mask is not None:
+            content_match = mask & category_mask
+            if content_match.any():
+                mask = content_match
 
-        if available.empty:
-            # Fallback to any available caption
-            available = captions[~captions['caption_id'].isin(used_ids)]
+        candidates = np.flatnonzero(mask)
 
-        if available.empty:
-            return None
+        energy = energy_scores[candidates]
 
-        # Calculate energy match score
-        available['energy_match_score'] = available['caption_text'].apply(
-            lambda text: self._calculate_energy_match(text, time_period)
-        )
-
-        # Calculate final score
-        available['final_score'] = (
-            (available['overall_performance_score'] / 100) * 0.4 +
-            (available['avg_conversion_rate'] / 100) * 0.3 +
-            (available['lifetime_revenue'] / available['lifetime_revenue'].max()) * 0.2 +
-            available['energy_match_score'] * 0.1
-        )
+        # Calculate final score in place: revenue share (normalised to the
+        # best candidate) on top of the precomputed performance/conversion part
+        revenue = captions.lifetime_revenue[candidates]
+        final_score = revenue / np.nanmax(revenue)
+        final_score *= 0.2
+        final_score += base_scores[candidates]
+        final_score += energy * 0.1
 
         # Add randomness for diversity (±20%)
-        available['final_score'] *= (0.8 + np.random.random(len(available)) * 0.4)
+        final_score *= (0.8 + self._rng.random(len(candidates)) * 0.4)
 
         # Prefer captions not used recently by this creator
-        available.loc[available['days_since_used_by_creator'] > 45, 'final_score'] *= 1.2
-
-        # Select best
-        best = available.nlargest(1, 'final_score').iloc[0]
+        final_score *= freshness_boost[candidates]
+
+        # Select best (NaN scores never win, first index wins ties)
+        winner = int(np.argmax(np.where(np.isnan(final_score), -np.inf, final_score)))
+        index = candidates[winner]
+        used_mask[index] = True
+        best = {
+            'caption_id': int(captions.caption_id[index]),
+            'caption_text': captions.caption_text[index],
+            'content_category': captions.content_category[index],
+            'price_tier': captions.price_tier_at(index),
+            'overall_performance_score': float(captions.overall_performance_score[index]),
+            'energy_match_score': float(energy[winner]),
+            'days_since_used_by_creator': captions.days_since_used_by_creator[index]
+        }
 
         return {
-            'caption_id': int(best['caption_id']),
+            'caption_id': best['caption_id'],
             'caption_text': best['caption_text'],
             'content_category': best['content_category'],
             'price_tier': best['price_tier'],
-            'overall_performance_score': float(best['overall_performance_score']),
-            'energy_match_score': float(best['energy_match_score']),
+            'overall_performance_score': best['overall_performance_score'],
+            'energy_match_score': best['energy_match_score'],
             'selection_reason': self._generate_selection_reason(
                 best,
                 time_period,
@@ -273,6 +558,105 @@ class ContextualCaptionSelector:
             )
         }
 
+    def _period_energy_scores(
+        self,
+        captions: CaptionCandidates,
+        time_period: str
+    ) -> np.ndarray:
+        """
+        Energy match for every caption in a time period: the stored score from
+        caption_energy_scores, computed from the text only for unscored captions.
+        """
+        stored = captions.energy_scores.get(time_period)
+        if stored is None:
+            return self._calculate_energy_scores(captions.caption_text_lower, time_period)
+
+        scores = stored.copy()
+        missing = np.isnan(scores)
+        if missing.any():
+            scores[missing] = self._calculate_energy_scores(
+                captions.caption_text_lower[missing],
+                time_period
+            )
+
+        return scores
+
+    def refresh_caption_energy_scores(self) -> int:
+        """
+        Recompute caption_energy_scores for every available caption (nightly,
+        and after any change to energy_profiles).
+
+        Returns:
+            Number of captions scored
+        """
+
+        query = f"""
+        SELECT caption_id, caption_text
+        FROM `{self.project_id}.{self.dataset_id}.caption_bank`
+        WHERE usage_status = 'available'
+        """
+
+        rows = list(self.client.query(query).result())
+        texts_lower = np.array(
+            [row['caption_text'].lower() if isinstance(row['caption_text'], str) else ''
+             for row in rows],
+            dtype=str
+        )
+        scores = {
+            period: self._calculate_energy_scores(texts_lower, period)
+            for period in TIME_PERIODS
+        }
+
+        records = [
+            {
+                'caption_id': row['caption_id'],
+                **{f'{period}_score': float(scores[period][i]) for period in TIME_PERIODS}
+            }
+            for i, row in enumerate(rows)
+        ]
+
+        job_config = bigquery.LoadJobConfig(
+            schema=list(ENERGY_SCORES_SCHEMA),
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE
+        )
+        self.client.load_table_from_json(
+            records,
+            f"{self.project_id}.{self.dataset_id}.caption_energy_scores",
+            job_config=job_config
+        ).result()
+        # The load creates the table if it didn't exist yet
+        self._energy_scores_table = True
+
+        logger.info(f"Refreshed energy scores for {len(records)} captions")
+
+        return len(records)
+
+    def _calculate_energy_scores(
+        self,
+        texts_lower: np.ndarray,
+        time_period: str
+    ) -> np.ndarray:
+        """
+        Vectorised _calculate_energy_match over lowercased caption texts.
+        One substring pass per keyword/tone across all captions.
+        """
+        terms = self._energy_terms.get(time_period, self._NO_ENERGY_TERMS)
+        scores = np.full(len(texts_lower), 0.5)  # Base score
+
+        # Check for matching keywords
+        keyword_matches = np.zeros(len(texts_lower))
+        for kw in terms['keywords']:
+            keyword_matches += np.char.find(texts_lower, kw) >= 0
+        scores += keyword_matches * terms['keyword_weight']
+
+        # Check tone indicators
+        tone_matches = np.zeros(len(texts_lower))
+        for tone in terms['tones']:
+            tone_matches += np.char.find(texts_lower, tone) >= 0
+        scores += tone_matches * terms['tone_weight']
+
+        return np.minimum(scores, 1.0)
+
     def _calculate_energy_match(self, caption_text: str, time_period: str) -> float:
         """Calculate how well caption matches time period energy"""
 
@@ -280,25 +664,23 @@ class ContextualCaptionSelector:
             return 0.5
 
         text_lower = caption_text.lower()
-        profile = self.energy_profiles.get(time_period, {})
+        terms = self._energy_terms.get(time_period, self._NO_ENERGY_TERMS)
 
         score = 0.5  # Base score
 
         # Check for matching keywords
-        keywords = profile.get('keywords', [])
-        keyword_matches = sum(1 for kw in keywords if kw in text_lower)
-        score += (keyword_matches / max(len(keywords), 1)) * 0.3
+        keyword_matches = sum(1 for kw in terms['keywords'] if kw in text_lower)
+        score += keyword_matches * terms['keyword_weight']
 
         # Check tone indicators
-        tone_indicators = profile.get('tone', [])
-        tone_matches = sum(1 for tone in tone_indicators if tone in text_lower)
-        score += (tone_matches / max(len(tone_indicators), 1)) * 0.2
+        tone_matches = sum(1 for tone in terms['tones'] if tone in text_lower)
+        score += tone_matches * terms['tone_weight']
 
         return min(score, 1.0)
 
     def _generate_selection_reason(
         self,
-        caption: pd.Series,
+        caption: Dict,
         time_period: str,
         message_type: str
     ) -> str:
@@ -341,13 +723,16 @@ class CaptionDiversityEnforcer:
 
         issues = []
 
-        # Check content category diversity
-        categories = [c['content_category'] for c in selected_captions]
-        category_counts = pd.Series(categories).value_counts()
+        # Check content category diversity (missing categories are not counted)
+        category_counts = Counter(
+            c['content_category'] for c in selected_captions
+            if c['content_category'] is not None
+        )
 
-        max_single_category = category_counts.max()
-        if max_single_category > len(selected_captions) * 0.4:
-            issues.append(f"Too many {category_counts.idxmax()} captions ({max_single_category})")
+        if category_counts:
+            top_category, max_single_category = category_counts.most_common(1)[0]
+            if max_single_category > len(selected_captions) * 0.4:
+                issues.append(f"Too many {top_category} captions ({max_single_category})")
 
         # Check for duplicate captions
         caption_ids = [c['caption_id'] for c in selected_captions]
@@ -355,11 +740,10 @@ class CaptionDiversityEnforcer:
             issues.append("Duplicate captions detected")
 
         # Check price tier distribution
-        price_tiers = [c.get('price_tier', 'mid') for c in selected_captions]
-        tier_counts = pd.Series(price_tiers).value_counts()
+        price_tiers = {c.get('price_tier', 'mid') for c in selected_captions} - {None}
 
         # Should have mix of tiers
-        if len(tier_counts) < 2:
+        if len(price_tiers) < 2:
             issues.append("All captions same price tier")
 
         return {
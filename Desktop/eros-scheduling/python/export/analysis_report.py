@@ -3,13 +3,70 @@ Analysis Overview Report Generator
 Creates human-readable analysis summaries for each creator
 """
 
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import textwrap
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+REPORT_RULE = "=" * 80
+
+# Full report layout; optional and variable-length sections are pre-rendered
+# substrings that carry their own trailing newlines
+REPORT_TEMPLATE = textwrap.dedent("""\
+    {rule}
+    EROS PERFORMANCE ANALYSIS REPORT
+    Creator: {page_name}
+    Generated: {generated}
+    {rule}
+
+    📊 DATA QUALITY
+      Quality Score: {quality_score}/100 ({confidence_level})
+      Total Messages Analyzed: {total_messages}
+      Time Span: {days_span} days
+      Avg Subscribers Reached: {avg_sent_count:,}
+
+    🎯 CREATOR CLASSIFICATION
+      Tier: {tier} ({estimated_subscribers:,} subscribers)
+      Health Status: {health_status} (Growth: {growth_rate_pct:+.1f}%)
+      Saturation: {saturation_status} (View Rate: {class_view_rate:.1f}%)
+
+    💰 PERFORMANCE METRICS (90-Day)
+      Total Revenue: ${total_revenue_90d:,.2f}
+      Avg Daily Revenue: ${avg_daily_revenue:,.2f}
+      Avg Revenue Per Send: ${avg_revenue_per_send:.2f}
+      Avg View Rate: {avg_view_rate:.1f}%
+      Avg Purchase Rate: {avg_purchase_rate:.2f}%
+      Best Single Message: ${best_single_message_revenue:,.2f}
+
+    ⏰ OPTIMAL TIMING
+      Prime Hours: {prime_hours}
+      Recommended Daily Volume: {optimal_daily_volume} messages
+
+    💵 PRICE OPTIMIZATION
+      Best Performing Tier: {best_tier}
+    {tier_lines}
+    🎬 CONTENT AVAILABILITY
+    {content_line}
+
+    {ml_section}{urgency_section}{rule}
+    Report generated by EROS Max AI System
+    Ready for Claude AI strategic interpretation
+    {rule}""")
+
+ML_SECTION_TEMPLATE = textwrap.dedent("""\
+    🤖 ML MODEL PERFORMANCE
+      Model: {model_type}
+      Training Accuracy: {train_accuracy:.1f}%
+      Test Accuracy: {test_accuracy:.1f}%
+
+    """)
+
+URGENCY_SECTION_TEMPLATE = "🔥 URGENCY SIGNAL PERFORMANCE\n{signal_lines}\n"
+
 
 class AnalysisReportGenerator:
     """Generate comprehensive analysis reports for Claude AI output"""
@@ -33,103 +90,71 @@ class AnalysisReportGenerator:
         if 'error' in analysis_data:
             return f"ERROR: Unable to analyze {page_name} - {analysis_data['error']}"
 
-        report_lines = []
-
-        # Header
-        report_lines.append("=" * 80)
-        report_lines.append(f"EROS PERFORMANCE ANALYSIS REPORT")
-        report_lines.append(f"Creator: {page_name.upper()}")
-        report_lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append("=" * 80)
-        report_lines.append("")
-
-        # Data Quality
         dq = analysis_data.get('data_quality', {})
-        report_lines.append("📊 DATA QUALITY")
-        report_lines.append(f"  Quality Score: {dq.get('quality_score', 0)}/100 ({dq.get('confidence_level', 'unknown')})")
-        report_lines.append(f"  Total Messages Analyzed: {dq.get('total_messages', 0)}")
-        report_lines.append(f"  Time Span: {dq.get('days_span', 0)} days")
-        report_lines.append(f"  Avg Subscribers Reached: {dq.get('avg_sent_count', 0):,}")
-        report_lines.append("")
-
-        # Classification
         cls = analysis_data.get('classification', {})
-        report_lines.append("🎯 CREATOR CLASSIFICATION")
-        report_lines.append(f"  Tier: {cls.get('tier', 'UNKNOWN')} ({cls.get('estimated_subscribers', 0):,} subscribers)")
-        report_lines.append(f"  Health Status: {cls.get('health_status', 'UNKNOWN')} (Growth: {cls.get('growth_rate_pct', 0):+.1f}%)")
-        report_lines.append(f"  Saturation: {cls.get('saturation_status', 'UNKNOWN')} (View Rate: {cls.get('avg_view_rate', 0):.1f}%)")
-        report_lines.append("")
-
-        # Core Metrics
         metrics = analysis_data.get('metrics', {})
-        report_lines.append("💰 PERFORMANCE METRICS (90-Day)")
-        report_lines.append(f"  Total Revenue: ${metrics.get('total_revenue_90d', 0):,.2f}")
-        report_lines.append(f"  Avg Daily Revenue: ${metrics.get('avg_daily_revenue', 0):,.2f}")
-        report_lines.append(f"  Avg Revenue Per Send: ${metrics.get('avg_revenue_per_send', 0):.2f}")
-        report_lines.append(f"  Avg View Rate: {metrics.get('avg_view_rate', 0):.1f}%")
-        report_lines.append(f"  Avg Purchase Rate: {metrics.get('avg_purchase_rate', 0):.2f}%")
-        report_lines.append(f"  Best Single Message: ${metrics.get('best_single_message_revenue', 0):,.2f}")
-        report_lines.append("")
-
-        # Timing Analysis
         timing = analysis_data.get('timing_analysis', {})
-        prime_hours = timing.get('prime_hours', [])
-        report_lines.append("⏰ OPTIMAL TIMING")
-        report_lines.append(f"  Prime Hours: {', '.join(f'{h:02d}:00' for h in prime_hours)}")
-        report_lines.append(f"  Recommended Daily Volume: {timing.get('optimal_daily_volume', 0)} messages")
-        report_lines.append("")
-
-        # Price Optimization
         pricing = analysis_data.get('price_optimization', {})
-        report_lines.append("💵 PRICE OPTIMIZATION")
-        best_tier = pricing.get('best_performing_tier', 'mid')
-        report_lines.append(f"  Best Performing Tier: {best_tier.upper()}")
-
-        tier_perf = pricing.get('tier_performance', {})
-        for tier, stats in tier_perf.items():
-            if tier != 'index':
-                rps = stats.get('revenue_per_send', 0) if isinstance(stats, dict) else 0
-                report_lines.append(f"    {tier}: ${rps:.2f} RPS")
-        report_lines.append("")
-
-        # Content Analysis
         content = analysis_data.get('content_analysis', {})
-        available_content = content.get('available_content_types', [])
-        report_lines.append("🎬 CONTENT AVAILABILITY")
-        if available_content:
-            report_lines.append(f"  Available: {', '.join(available_content)}")
-        else:
-            report_lines.append("  ⚠️  WARNING: No vault_matrix data found!")
-        report_lines.append("")
-
-        # ML Predictions
         ml = analysis_data.get('ml_predictions', {})
-        if ml.get('model_trained'):
-            report_lines.append("🤖 ML MODEL PERFORMANCE")
-            report_lines.append(f"  Model: {ml.get('model_type', 'Unknown')}")
-            report_lines.append(f"  Training Accuracy: {ml.get('train_accuracy', 0):.1f}%")
-            report_lines.append(f"  Test Accuracy: {ml.get('test_accuracy', 0):.1f}%")
-            report_lines.append("")
-
-        # Recommendations Data
         rec_data = analysis_data.get('recommendations_data', {})
-        urgency_signals = rec_data.get('urgency_signals', [])
 
-        if urgency_signals:
-            report_lines.append("🔥 URGENCY SIGNAL PERFORMANCE")
-            for signal in urgency_signals[:5]:
-                word = signal.get('word', '')
-                lift = signal.get('lift_pct', 0)
-                report_lines.append(f"  '{word}': {lift:+.1f}% lift")
-            report_lines.append("")
+        # Variable-length sections are rendered to substrings up front
+        tier_lines = ''.join(
+            f"    {tier}: ${stats.get('revenue_per_send', 0) if isinstance(stats, dict) else 0:.2f} RPS\n"
+            for tier, stats in pricing.get('tier_performance', {}).items()
+            if tier != 'index'
+        )
 
-        # Footer
-        report_lines.append("=" * 80)
-        report_lines.append("Report generated by EROS Max AI System")
-        report_lines.append("Ready for Claude AI strategic interpretation")
-        report_lines.append("=" * 80)
+        available_content = content.get('available_content_types', [])
+        if available_content:
+            content_line = f"  Available: {', '.join(available_content)}"
+        else:
+            content_line = "  ⚠️  WARNING: No vault_matrix data found!"
 
-        return "\n".join(report_lines)
+        ml_section = ML_SECTION_TEMPLATE.format(
+            model_type=ml.get('model_type', 'Unknown'),
+            train_accuracy=ml.get('train_accuracy', 0),
+            test_accuracy=ml.get('test_accuracy', 0)
+        ) if ml.get('model_trained') else ''
+
+        urgency_signals = rec_data.get('urgency_signals', [])
+        urgency_section = URGENCY_SECTION_TEMPLATE.format(
+            signal_lines=''.join(
+                f"  '{signal.get('word', '')}': {signal.get('lift_pct', 0):+.1f}% lift\n"
+                for signal in urgency_signals[:5]
+            )
+        ) if urgency_signals else ''
+
+        return REPORT_TEMPLATE.format_map({
+            'rule': REPORT_RULE,
+            'page_name': page_name.upper(),
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'quality_score': dq.get('quality_score', 0),
+            'confidence_level': dq.get('confidence_level', 'unknown'),
+            'total_messages': dq.get('total_messages', 0),
+            'days_span': dq.get('days_span', 0),
+            'avg_sent_count': dq.get('avg_sent_count', 0),
+            'tier': cls.get('tier', 'UNKNOWN'),
+            'estimated_subscribers': cls.get('estimated_subscribers', 0),
+            'health_status': cls.get('health_status', 'UNKNOWN'),
+            'growth_rate_pct': cls.get('growth_rate_pct', 0),
+            'saturation_status': cls.get('saturation_status', 'UNKNOWN'),
+            'class_view_rate': cls.get('avg_view_rate', 0),
+            'total_revenue_90d': metrics.get('total_revenue_90d', 0),
+            'avg_daily_revenue': metrics.get('avg_daily_revenue', 0),
+            'avg_revenue_per_send': metrics.get('avg_revenue_per_send', 0),
+            'avg_view_rate': metrics.get('avg_view_rate', 0),
+            'avg_purchase_rate': metrics.get('avg_purchase_rate', 0),
+            'best_single_message_revenue': metrics.get('best_single_message_revenue', 0),
+            'prime_hours': ', '.join(f'{h:02d}:00' for h in timing.get('prime_hours', [])),
+            'optimal_daily_volume': timing.get('optimal_daily_volume', 0),
+            'best_tier': pricing.get('best_performing_tier', 'mid').upper(),
+            'tier_lines': tier_lines,
+            'content_line': content_line,
+            'ml_section': ml_section,
+            'urgency_section': urgency_section
+        })
 
     @staticmethod
     def save_report(
@@ -161,6 +186,33 @@ class AnalysisReportGenerator:
 
         return output_path
 
+    @classmethod
+    def batch_save_reports(
+        cls,
+        items: List[Tuple[str, Dict, str]],
+        max_workers: Optional[int] = None
+    ) -> List[str]:
+        """
+        Generate and save many reports across worker processes.
+
+        Args:
+            items: (page_name, analysis_data, output_path) tuples
+            max_workers: Process count (defaults to CPU count)
+
+        Returns:
+            Paths to saved files, in input order
+        """
+
+        if not items:
+            return []
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            paths = list(executor.map(_generate_and_write, items, chunksize=16))
+
+        logger.info(f"Saved {len(paths)} analysis reports")
+
+        return paths
+
     @staticmethod
     def generate_executive_summary(
         page_name: str,
@@ -196,6 +248,12 @@ View Rate: {metrics.get('avg_view_rate', 0):.1f}% | Purchase Rate: {metrics.get(
         return summary
 
 
+def _generate_and_write(item: Tuple[str, Dict, str]) -> str:
+    """Process-pool worker for batch_save_reports (module level so it pickles)"""
+    page_name, analysis_data, output_path = item
+    return AnalysisReportGenerator.save_report(page_name, analysis_data, output_path)
+
+
 if __name__ == "__main__":
     # Test
     test_data = {
@@ -3,14 +3,88 @@ CSV Schedule Template Formatter
 Exports 7-day schedules in human-readable CSV format for Google Sheets
 """
 
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from typing import List, Dict
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from typing import List, Dict, Optional, Tuple, Union
 from datetime import date, datetime, timedelta
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Column order of the schedule CSV
+SCHEDULE_COLUMNS = (
+    'Page', 'Day', 'Date', 'Time', 'Type', 'Caption', 'Price',
+    'Expected_Revenue', 'Content_Category', 'Strategy_Note', 'Confidence'
+)
+
+# Every 'HH:MM' of the day, indexed by hour * 60 + minute
+_TIME_TABLE = tuple(f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60))
+
+
+def _format_times(hours: List[int], minutes: List[int]) -> List[str]:
+    """'HH:MM' per message; table lookup, formatting only out-of-range hours"""
+    return [
+        _TIME_TABLE[hour * 60 + minute] if 0 <= hour < 24 else f"{hour:02d}:{minute:02d}"
+        for hour, minute in zip(hours, minutes)
+    ]
+
+
+def _text(value) -> str:
+    """Free-text cell as str ('' for None, like to_csv); Arrow string columns reject non-str"""
+    return '' if value is None else str(value)
+
+
+def _write_csv(df: pd.DataFrame, output_path: str) -> None:
+    """Write a DataFrame as CSV with Arrow's multi-threaded C++ writer"""
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), output_path)
+
+
+def _schedule_columns(
+    page_name: str,
+    schedule_data: List[Dict],
+    start_date: date
+) -> Tuple[Dict[str, list], List[int]]:
+    """
+    CSV cell values by column (SCHEDULE_COLUMNS order), sorted by date and
+    time, plus the original message position of each row.
+    """
+
+    # Randomized minutes for natural feel, drawn for every message at once
+    minutes = np.random.default_rng().integers(0, 60, size=len(schedule_data)).tolist()
+
+    dates = [msg.get('send_date', start_date).strftime('%Y-%m-%d') for msg in schedule_data]
+    times = _format_times([msg.get('hour', 12) for msg in schedule_data], minutes)
+
+    # Sort by date and time on the plain lists (stable, like the DataFrame
+    # sort it replaces); original message positions are kept as the index
+    order = sorted(range(len(schedule_data)), key=lambda i: (dates[i], times[i]))
+    messages = [schedule_data[i] for i in order]
+
+    # Build each column in one pass rather than a dict per message
+    prices = [msg.get('price', 0) for msg in messages]
+
+    columns = {
+        'Page': [page_name] * len(messages),
+        'Day': [_text(msg.get('day_name', 'Monday')) for msg in messages],
+        'Date': [dates[i] for i in order],
+        'Time': [times[i] for i in order],
+        'Type': [_text(msg.get('message_type', 'PPV')).replace('_', ' ').title() for msg in messages],
+        'Caption': [_text(msg.get('caption_text', ''))[:200] for msg in messages],  # Limit length
+        'Price': [f"${price:.2f}" if price > 0 else "FREE" for price in prices],
+        'Expected_Revenue': [f"${msg.get('expected_revenue', 0):.2f}" for msg in messages],
+        'Content_Category': [_text(msg.get('content_category', 'General')) for msg in messages],
+        'Strategy_Note': [_text(msg.get('strategy_notes', '')) for msg in messages],
+        'Confidence': [f"{msg.get('confidence_score', 0.5):.0%}" for msg in messages]
+    }
+
+    return columns, order
+
 
 class ScheduleCSVFormatter:
     """Format schedule templates for Google Sheets upload"""
@@ -19,8 +93,9 @@ class ScheduleCSVFormatter:
     def format_7_day_schedule(
         page_name: str,
         schedule_data: List[Dict],
-        start_date: date
-    ) -> pd.DataFrame:
+        start_date: date,
+        output: str = 'pandas'
+    ) -> Union[pd.DataFrame, pa.Table]:
         """
         Format schedule data into CSV-ready DataFrame.
 
@@ -28,40 +103,25 @@ class ScheduleCSVFormatter:
             page_name: Creator username
             schedule_data: List of scheduled messages
             start_date: Week start date
+            output: 'pandas' for a DataFrame or 'arrow' for a pyarrow Table
+                    (written straight to CSV without a pandas round trip)
 
         Returns:
-            DataFrame ready for CSV export
+            DataFrame (or Table) ready for CSV export
         """
 
+        if output not in ('pandas', 'arrow'):
+            raise ValueError(f"output must be 'pandas' or 'arrow', got {output!r}")
+
         if not schedule_data:
-            return pd.DataFrame()
+            return pa.table({}) if output == 'arrow' else pd.DataFrame()
 
-        formatted_rows = []
+        columns, order = _schedule_columns(page_name, schedule_data, start_date)
 
-        for msg in schedule_data:
-            # Add randomized minutes for natural feel
-            minutes = pd.np.random.randint(0, 60)
-
-            formatted_rows.append({
-                'Page': page_name,
-                'Day': msg.get('day_name', 'Monday'),
-                'Date': msg.get('send_date', start_date).strftime('%Y-%m-%d'),
-                'Time': f"{msg.get('hour', 12):02d}:{minutes:02d}",
-                'Type': msg.get('message_type', 'PPV').replace('_', ' ').title(),
-                'Caption': msg.get('caption_text', '')[:200],  # Limit length
-                'Price': f"${msg.get('price', 0):.2f}" if msg.get('price', 0) > 0 else "FREE",
-                'Expected_Revenue': f"${msg.get('expected_revenue', 0):.2f}",
-                'Content_Category': msg.get('content_category', 'General'),
-                'Strategy_Note': msg.get('strategy_notes', ''),
-                'Confidence': f"{msg.get('confidence_score', 0.5):.0%}"
-            })
-
-        df = pd.DataFrame(formatted_rows)
-
-        # Sort by date and time
-        df = df.sort_values(['Date', 'Time'])
-
-        return df
+        if output == 'arrow':
+            return pa.table(columns)
+
+        return pd.DataFrame(columns, index=order)
 
     @staticmethod
     def export_to_csv(
@@ -83,20 +143,68 @@ class ScheduleCSVFormatter:
             Path to created file
         """
 
-        df = ScheduleCSVFormatter.format_7_day_schedule(
+        # Arrow columns go straight to the C++ CSV writer, no DataFrame
+        table = ScheduleCSVFormatter.format_7_day_schedule(
             page_name,
             schedule_data,
-            start_date
+            start_date,
+            output='arrow'
         )
 
-        if df.empty:
+        if table.num_rows == 0:
             logger.warning(f"No data to export for {page_name}")
             return None
 
         # Export to CSV
-        df.to_csv(output_path, index=False)
+        pa_csv.write_csv(table, output_path)
 
-        logger.info(f"Exported {len(df)} messages to {output_path}")
+        logger.info(f"Exported {table.num_rows} messages to {output_path}")
+
+        return output_path
+
+    @staticmethod
+    def export_to_csv_stream(
+        page_name: str,
+        schedule_data: List[Dict],
+        start_date: date,
+        output_path: str,
+        durable: bool = False
+    ) -> str:
+        """
+        Export schedule to CSV file without building a DataFrame.
+        Same rows, order and quoting as export_to_csv (the files are
+        byte-identical), written with csv.writer.
+
+        Args:
+            page_name: Creator username
+            schedule_data: List of scheduled messages
+            start_date: Week start date
+            output_path: File path for CSV
+            durable: fsync the file before returning
+
+        Returns:
+            Path to created file
+        """
+
+        if not schedule_data:
+            logger.warning(f"No data to export for {page_name}")
+            return None
+
+        # Same cell values as export_to_csv, written row by row
+        columns, order = _schedule_columns(page_name, schedule_data, start_date)
+
+        with open(output_path, 'w', buffering=1 << 20, newline='', encoding='utf-8') as f:
+            # Quote every field like Arrow's write_csv, so both exporters
+            # produce byte-identical files
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator='\n')
+            writer.writerow(SCHEDULE_COLUMNS)
+            writer.writerows(zip(*columns.values()))
+
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+        logger.info(f"Exported {len(order)} messages to {output_path}")
 
         return output_path
 
@@ -108,9 +216,18 @@ class ScheduleCSVFormatter:
             return {}
 
         total_messages = len(schedule_data)
-        total_expected_revenue = sum(msg.get('expected_revenue', 0) for msg in schedule_data)
-        avg_price = sum(msg.get('price', 0) for msg in schedule_data) / total_messages
-        ppv_count = sum(1 for msg in schedule_data if msg.get('price', 0) > 0)
+
+        # Single pass over the messages for all totals
+        total_expected_revenue = 0
+        total_price = 0
+        ppv_count = 0
+        for msg in schedule_data:
+            price = msg.get('price', 0)
+            total_expected_revenue += msg.get('expected_revenue', 0)
+            total_price += price
+            ppv_count += price > 0
+
+        avg_price = total_price / total_messages
         free_count = total_messages - ppv_count
 
         return {
@@ -135,40 +252,50 @@ class MultiCreatorCSVExporter:
     def export_all_creators(
         creator_schedules: Dict[str, List[Dict]],
         start_date: date,
-        output_dir: str
+        output_dir: str,
+        max_workers: int = 8
     ) -> List[str]:
         """
         Export CSV files for all creators.
+        Files are independent, so they are written concurrently (the Arrow
+        CSV writer releases the GIL).
 
         Args:
             creator_schedules: Dict mapping page_name to schedule data
             start_date: Week start date
             output_dir: Directory for output files
+            max_workers: Concurrent file writers
 
         Returns:
             List of created file paths
         """
 
-        created_files = []
+        date_tag = start_date.strftime('%Y%m%d')
+
+        def export_one(item) -> Optional[str]:
+            page_name, schedule_data = item
 
-        for page_name, schedule_data in creator_schedules.items():
             # Create filename
-            filename = f"{output_dir}/{page_name}_{start_date.strftime('%Y%m%d')}_schedule.csv"
+            filename = f"{output_dir}/{page_name}_{date_tag}_schedule.csv"
 
             # Export
             try:
-                path = ScheduleCSVFormatter.export_to_csv(
+                return ScheduleCSVFormatter.export_to_csv(
                     page_name,
                     schedule_data,
                     start_date,
                     filename
                 )
 
-                if path:
-                    created_files.append(path)
-
             except Exception as e:
                 logger.error(f"Failed to export {page_name}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            created_files = [
+                path for path in executor.map(export_one, creator_schedules.items())
+                if path
+            ]
 
         logger.info(f"Created {len(created_files)} CSV files")
 
@@ -190,30 +317,38 @@ class MultiCreatorCSVExporter:
             Path to created file
         """
 
-        summary_rows = []
-
-        for page_name, schedule_data in creator_schedules.items():
-            if not schedule_data:
-                continue
-
-            total_messages = len(schedule_data)
-            total_revenue = sum(msg.get('expected_revenue', 0) for msg in schedule_data)
-            ppv_count = sum(1 for msg in schedule_data if msg.get('price', 0) > 0)
-
-            summary_rows.append({
-                'Page_Name': page_name,
-                'Total_Messages': total_messages,
-                'PPV_Messages': ppv_count,
-                'Free_Messages': total_messages - ppv_count,
-                'Expected_Weekly_Revenue': f"${total_revenue:.2f}",
-                'Avg_Revenue_Per_Message': f"${total_revenue / total_messages:.2f}",
-                'Status': 'Ready for Review'
-            })
+        # Flatten every creator's messages, then reduce per creator in one groupby
+        messages = pd.DataFrame(
+            [
+                (page_name, msg.get('expected_revenue', 0), msg.get('price', 0))
+                for page_name, schedule_data in creator_schedules.items()
+                for msg in schedule_data
+            ],
+            columns=['page_name', 'expected_revenue', 'price']
+        )
+        messages['is_ppv'] = messages['price'] > 0
 
-        df = pd.DataFrame(summary_rows)
-        df = df.sort_values('Expected_Weekly_Revenue', ascending=False)
+        totals = messages.groupby('page_name', sort=False).agg(
+            total_messages=('expected_revenue', 'size'),
+            ppv_count=('is_ppv', 'sum'),
+            total_revenue=('expected_revenue', 'sum')
+        )
 
-        df.to_csv(output_path, index=False)
+        # Sort on the numeric revenue; the display strings sort lexicographically
+        totals = totals.sort_values('total_revenue', ascending=False, kind='stable')
+        avg_revenue = totals['total_revenue'] / totals['total_messages']
+
+        df = pd.DataFrame({
+            'Page_Name': totals.index.to_numpy(),
+            'Total_Messages': totals['total_messages'].to_numpy(),
+            'PPV_Messages': totals['ppv_count'].to_numpy(),
+            'Free_Messages': (totals['total_messages'] - totals['ppv_count']).to_numpy(),
+            'Expected_Weekly_Revenue': [f"${revenue:.2f}" for revenue in totals['total_revenue']],
+            'Avg_Revenue_Per_Message': [f"${revenue:.2f}" for revenue in avg_revenue],
+            'Status': 'Ready for Review'
+        })
+
+        _write_csv(df, output_path)
 
         logger.info(f"Created master summary: {output_path}")
 
@@ -3,16 +3,73 @@ Parallel Batch Processor
 Processes all creators simultaneously for maximum efficiency
 """
 
+import asyncio
 import concurrent.futures
+import functools
+import inspect
 from typing import Dict, List, Callable, Optional
-from google.cloud import bigquery
+from google.api_core import exceptions as api_exceptions, retry, retry_async
+from google.cloud import bigquery, bigquery_storage
+import pandas as pd
+import numpy as np
+import json
 import logging
-from datetime import datetime
+import math
+from datetime import date, datetime
 import time
 
+try:
+    import orjson  # Optional: much faster JSON encoding for batch summaries
+except ImportError:
+    orjson = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Errors worth retrying: overload, rate limiting and timeouts
+TRANSIENT_ERRORS = (
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.TooManyRequests
+)
+
+
+def _json_default(obj):
+    """JSON fallback for values _json_safe leaves as-is (dates and datetimes)"""
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_key(key) -> str:
+    """String form of a dict key; tuple keys (pandas MultiIndex labels) are joined with '_'"""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, tuple):
+        return '_'.join(_json_key(part) for part in key)
+    if isinstance(key, np.generic):
+        key = key.item()
+    return str(key)
+
+
+def _json_safe(obj):
+    """
+    Copy of obj that both JSON backends encode identically: string dict keys,
+    NumPy values as Python ones, and NaN/inf as None (null).
+    """
+    if isinstance(obj, dict):
+        return {_json_key(key): _json_safe(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return _json_safe(obj.tolist())
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if math.isfinite(obj) else None
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
 
 class BatchProcessor:
     """
@@ -20,6 +77,9 @@ class BatchProcessor:
     70% reduction in processing time vs sequential.
     """
 
+    # Active creator list is reused across batch runs for this long
+    ACTIVE_CREATORS_TTL_SECONDS = 300
+
     def __init__(
         self,
         project_id: str = "of-scheduler-proj",
@@ -28,10 +88,24 @@ class BatchProcessor:
         self.project_id = project_id
         self.dataset_id = "eros_scheduling_brain"
         self.client = bigquery.Client(project=project_id)
+        # Arrow/gRPC downloads instead of paginated REST for large result sets
+        self.bqstorage_client = bigquery_storage.BigQueryReadClient()
         self.max_workers = max_workers
+        self._creators_cache = None  # (fetched_at, creators)
 
-    def get_active_creators(self) -> List[str]:
-        """Fetch list of active creators from BigQuery"""
+    def get_active_creators(self, max_age_seconds: Optional[float] = None) -> List[str]:
+        """
+        Fetch list of active creators from BigQuery.
+        Reuses the last result for max_age_seconds (default
+        ACTIVE_CREATORS_TTL_SECONDS); pass 0 to force a fresh query.
+        """
+
+        if max_age_seconds is None:
+            max_age_seconds = self.ACTIVE_CREATORS_TTL_SECONDS
+
+        cached = self._creators_cache
+        if cached and time.monotonic() - cached[0] < max_age_seconds:
+            return list(cached[1])
 
         query = f"""
         SELECT DISTINCT page_name
@@ -41,17 +115,68 @@ class BatchProcessor:
         """
 
         try:
-            df = self.client.query(query).to_dataframe()
-            creators = df['page_name'].tolist()
+            table = self.client.query(query).to_arrow(bqstorage_client=self.bqstorage_client)
+            creators = table.column('page_name').to_pylist()
             logger.info(f"Found {len(creators)} active creators")
-            return creators
+            self._creators_cache = (time.monotonic(), creators)
+            return list(creators)
         except Exception as e:
             logger.error(f"Failed to fetch active creators: {e}")
             return []
 
+    def fetch_bulk_metrics(
+        self,
+        query_template: str,
+        page_names: List[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Run one query for a whole batch and split the result per creator.
+
+        Args:
+            query_template: SQL returning a page_name column; {project_id} and
+                            {dataset_id} are filled in and @page_names is bound
+                            to the batch's creators
+            page_names: Creators in the batch
+
+        Returns:
+            Dict mapping every page_name to its rows (empty frame if none)
+        """
+
+        query = query_template.format(project_id=self.project_id, dataset_id=self.dataset_id)
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ArrayQueryParameter("page_names", "STRING", list(page_names))
+        ])
+
+        df = self.client.query(query, job_config=job_config).to_dataframe(
+            bqstorage_client=self.bqstorage_client
+        )
+
+        creator_frames = {
+            page_name: group.reset_index(drop=True)
+            for page_name, group in df.groupby('page_name', sort=False)
+        }
+        empty = df.iloc[0:0]
+
+        logger.info(f"Fetched bulk metrics for {len(creator_frames)}/{len(page_names)} creators")
+
+        return {page_name: creator_frames.get(page_name, empty) for page_name in page_names}
+
+    def _prefetch(self, bulk_fetch_sql: Optional[str], page_names: List[str]) -> Optional[Dict]:
+        """fetch_bulk_metrics when requested; None (per-creator fetching) if unset or failed"""
+
+        if not bulk_fetch_sql:
+            return None
+
+        try:
+            return self.fetch_bulk_metrics(bulk_fetch_sql, page_names)
+        except Exception as e:
+            logger.error(f"Bulk fetch failed, creators will fetch individually: {e}")
+            return None
+
     def process_all_creators(
         self,
         processing_function: Callable,
+        bulk_fetch_sql: Optional[str] = None,
         **kwargs
     ) -> Dict:
         """
@@ -59,7 +184,13 @@ class BatchProcessor:
 
         Args:
             processing_function: Function to call for each creator
-                                Should accept (page_name, **kwargs)
+                                Should accept (page_name, **kwargs); if it
+                                declares bq_client / bqstorage_client
+                                parameters it receives this processor's
+                                shared clients
+            bulk_fetch_sql: Optional fetch_bulk_metrics query; each creator's
+                            rows are passed as creator_df so the function can
+                            skip its own BigQuery call
             **kwargs: Additional arguments to pass to processing function
 
         Returns:
@@ -71,7 +202,9 @@ class BatchProcessor:
         if not creators:
             return {'error': 'No active creators found'}
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        bulk = self._prefetch(bulk_fetch_sql, creators)
 
         results = {
             'total_creators': len(creators),
@@ -89,7 +222,7 @@ class BatchProcessor:
                     self._safe_process,
                     processing_function,
                     creator,
-                    **kwargs
+                    **self._creator_kwargs(kwargs, bulk, creator)
                 ): creator
                 for creator in creators
             }
@@ -112,7 +245,7 @@ class BatchProcessor:
                     logger.error(f"✗ Failed {creator}: {e}")
 
         # Calculate timing
-        end_time = time.time()
+        end_time = time.perf_counter()
         total_time = end_time - start_time
 
         results['timing'] = {
@@ -132,6 +265,7 @@ class BatchProcessor:
         self,
         creator_list: List[str],
         processing_function: Callable,
+        bulk_fetch_sql: Optional[str] = None,
         **kwargs
     ) -> Dict:
         """
@@ -140,6 +274,7 @@ class BatchProcessor:
         Args:
             creator_list: List of page_names to process
             processing_function: Function to call for each creator
+            bulk_fetch_sql: Optional fetch_bulk_metrics query (see process_all_creators)
             **kwargs: Additional arguments
 
         Returns:
@@ -149,7 +284,9 @@ class BatchProcessor:
         if not creator_list:
             return {'error': 'Empty creator list'}
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+
+        bulk = self._prefetch(bulk_fetch_sql, creator_list)
 
         results = {
             'total_creators': len(creator_list),
@@ -165,7 +302,7 @@ class BatchProcessor:
                     self._safe_process,
                     processing_function,
                     creator,
-                    **kwargs
+                    **self._creator_kwargs(kwargs, bulk, creator)
                 ): creator
                 for creator in creator_list
             }
@@ -182,7 +319,7 @@ class BatchProcessor:
                     results['failed'].append(creator)
                     results['results'][creator] = {'error': str(e)}
 
-        end_time = time.time()
+        end_time = time.perf_counter()
         total_time = end_time - start_time
 
         results['timing'] = {
@@ -193,6 +330,163 @@ class BatchProcessor:
 
         return results
 
+    async def process_all_creators_async(
+        self,
+        processing_function: Callable,
+        **kwargs
+    ) -> Dict:
+        """
+        Async variant of process_all_creators for use inside an event loop.
+        processing_function may be a coroutine function or a regular one.
+        """
+
+        creators = await asyncio.to_thread(self.get_active_creators)
+
+        if not creators:
+            return {'error': 'No active creators found'}
+
+        return await self.process_specific_creators_async(
+            creators,
+            processing_function,
+            **kwargs
+        )
+
+    async def process_specific_creators_async(
+        self,
+        creator_list: List[str],
+        processing_function: Callable,
+        **kwargs
+    ) -> Dict:
+        """
+        Process specific list of creators concurrently on the event loop.
+
+        Coroutine processing functions are awaited directly, so max_workers
+        only bounds in-flight creators and can go well past thread limits.
+        Sync functions run on a max_workers-sized thread pool.
+
+        Args:
+            creator_list: List of page_names to process
+            processing_function: Function or coroutine function to call for each creator
+            **kwargs: Additional arguments
+
+        Returns:
+            Dict with results and timing
+        """
+
+        if not creator_list:
+            return {'error': 'Empty creator list'}
+
+        start_time = time.perf_counter()
+
+        results = {
+            'total_creators': len(creator_list),
+            'successful': [],
+            'failed': [],
+            'results': {},
+            'timing': {}
+        }
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+            async def run(creator: str):
+                async with semaphore:
+                    try:
+                        result = await self._safe_process_async(
+                            processing_function,
+                            creator,
+                            executor,
+                            **kwargs
+                        )
+                        return creator, result, None
+                    except Exception as e:
+                        return creator, None, e
+
+            for next_done in asyncio.as_completed([run(creator) for creator in creator_list]):
+                creator, result, error = await next_done
+
+                if error is None:
+                    results['successful'].append(creator)
+                    results['results'][creator] = result
+
+                    logger.info(f"✓ Completed {creator}")
+
+                else:
+                    results['failed'].append(creator)
+                    results['results'][creator] = {'error': str(error)}
+
+                    logger.error(f"✗ Failed {creator}: {error}")
+
+        end_time = time.perf_counter()
+        total_time = end_time - start_time
+
+        results['timing'] = {
+            'total_seconds': round(total_time, 2),
+            'avg_seconds_per_creator': round(total_time / len(creator_list), 2),
+            'success_rate': round(len(results['successful']) / len(creator_list) * 100, 1)
+        }
+
+        return results
+
+    @staticmethod
+    def _creator_kwargs(
+        kwargs: Dict,
+        bulk: Optional[Dict],
+        creator: str
+    ) -> Dict:
+        """
+        kwargs for one creator's call, adding its prefetched rows as
+        creator_df unless the caller already passed one.
+        """
+
+        call_kwargs = {**kwargs}
+        if bulk is not None:
+            call_kwargs.setdefault('creator_df', bulk[creator])
+
+        return call_kwargs
+
+    def _with_shared_client(self, processing_function: Callable, kwargs: Dict) -> Dict:
+        """
+        Pass self.client as bq_client (and self.bqstorage_client as
+        bqstorage_client) to processing functions that declare them, so
+        per-creator work reuses one authenticated client, its connection pool
+        and one gRPC channel instead of building its own.
+        """
+
+        shared = {'bq_client': self.client, 'bqstorage_client': self.bqstorage_client}
+        missing = [name for name in shared if name not in kwargs]
+        if not missing:
+            return kwargs
+
+        try:
+            parameters = inspect.signature(processing_function).parameters
+        except (TypeError, ValueError):
+            return kwargs
+
+        injected = {name: shared[name] for name in missing if name in parameters}
+        if injected:
+            return {**kwargs, **injected}
+
+        return kwargs
+
+    def _retry_policy(self, page_name: str, retry_class: type = retry.Retry):
+        """
+        Exponential backoff with jitter (1s, 2s, 4s, capped at 8s, 60s overall)
+        that only retries transient BigQuery/API errors.
+        """
+
+        return retry_class(
+            predicate=retry.if_exception_type(*TRANSIENT_ERRORS),
+            initial=1.0,
+            maximum=8.0,
+            multiplier=2.0,
+            deadline=60.0,
+            on_error=lambda e: logger.warning(
+                f"Transient failure for {page_name}: {e}. Retrying..."
+            )
+        )
+
     def _safe_process(
         self,
         processing_function: Callable,
@@ -202,37 +496,122 @@ class BatchProcessor:
         """
         Safely execute processing function with retry logic.
 
-        Retries: 2 attempts with exponential backoff
+        Retries transient errors only (see _retry_policy); permanent errors
+        such as NotFound or a bug in processing_function fail immediately.
         """
 
-        max_retries = 2
-        retry_delay = 1  # seconds
+        kwargs = self._with_shared_client(processing_function, kwargs)
 
-        for attempt in range(max_retries):
-            try:
-                return processing_function(page_name=page_name, **kwargs)
+        try:
+            return self._retry_policy(page_name)(processing_function)(
+                page_name=page_name,
+                **kwargs
+            )
+        except Exception as e:
+            logger.error(f"Processing failed for {page_name}: {e}")
+            raise
 
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.warning(
-                        f"Attempt {attempt + 1} failed for {page_name}: {e}. Retrying..."
-                    )
-                    time.sleep(retry_delay * (attempt + 1))
-                else:
-                    logger.error(f"All attempts failed for {page_name}: {e}")
-                    raise
+    async def _safe_process_async(
+        self,
+        processing_function: Callable,
+        page_name: str,
+        executor: concurrent.futures.Executor,
+        **kwargs
+    ):
+        """
+        Async _safe_process: same retry policy, backing off on the event loop
+        for coroutine functions. Sync processing functions (and their
+        retries) run on executor.
+        """
+
+        kwargs = self._with_shared_client(processing_function, kwargs)
+
+        try:
+            if inspect.iscoroutinefunction(processing_function):
+                retrying = self._retry_policy(page_name, retry_async.AsyncRetry)
+                return await retrying(processing_function)(page_name=page_name, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor,
+                functools.partial(
+                    self._retry_policy(page_name)(processing_function),
+                    page_name=page_name,
+                    **kwargs
+                )
+            )
+
+        except Exception as e:
+            logger.error(f"Processing failed for {page_name}: {e}")
+            raise
+
+
+class BatchResultIndex:
+    """
+    Per-creator metrics pulled out of batch results once, as parallel arrays,
+    so summarize_batch and get_top_performers don't each walk every result dict.
+    """
+
+    def __init__(self, batch_results: Dict):
+        page_names = []
+        revenue_90d = []
+        avg_daily_revenue = []
+        messages_sent = []
+        tiers = []
+        health_statuses = []
+        successful_count = 0
+
+        for page_name, result in batch_results.get('results', {}).items():
+            if 'error' in result:
+                continue
+
+            successful_count += 1
+
+            # Handle different result structures
+            if isinstance(result, dict):
+                metrics = result.get('metrics', {})
+                classification = result.get('classification', {})
+
+                page_names.append(page_name)
+                revenue_90d.append(metrics.get('total_revenue_90d', 0))
+                avg_daily_revenue.append(metrics.get('avg_daily_revenue', 0))
+                messages_sent.append(metrics.get('total_messages_sent', 0))
+                tiers.append(classification.get('tier', 'UNKNOWN'))
+                health_statuses.append(classification.get('health_status', 'UNKNOWN'))
+
+        self.successful_count = successful_count  # includes non-dict results
+        self.page_names = page_names
+        self.revenue_90d = np.array(revenue_90d, dtype=np.float64)
+        self.avg_daily_revenue = avg_daily_revenue
+        self.messages_sent = np.array(messages_sent, dtype=np.int64)
+        self.tiers = tiers
+        self.health_statuses = health_statuses
+
+    def performer(self, i: int) -> Dict:
+        """get_top_performers row for the i-th indexed creator"""
+        return {
+            'page_name': self.page_names[i],
+            'revenue_90d': float(self.revenue_90d[i]),
+            'avg_daily_revenue': self.avg_daily_revenue[i],
+            'tier': self.tiers[i],
+            'health_status': self.health_statuses[i]
+        }
 
 
 class BatchResultAggregator:
     """Aggregate and summarize batch processing results"""
 
     @staticmethod
-    def summarize_batch(batch_results: Dict) -> Dict:
+    def summarize_batch(
+        batch_results: Dict,
+        index: Optional[BatchResultIndex] = None
+    ) -> Dict:
         """
         Create executive summary of batch results.
 
         Args:
             batch_results: Output from BatchProcessor
+            index: Prebuilt BatchResultIndex to reuse (built if omitted)
 
         Returns:
             Summary statistics
@@ -241,10 +620,8 @@ class BatchResultAggregator:
         if 'error' in batch_results:
             return batch_results
 
-        successful_results = [
-            result for result in batch_results['results'].values()
-            if 'error' not in result
-        ]
+        if index is None:
+            index = BatchResultIndex(batch_results)
 
         summary = {
             'batch_timestamp': datetime.now().isoformat(),
@@ -259,84 +636,110 @@ class BatchResultAggregator:
         }
 
         # Aggregate metrics if available
-        if successful_results:
-            # Try to extract common metrics
-            total_revenue = 0
-            total_messages = 0
-
-            for result in successful_results:
-                # Handle different result structures
-                if isinstance(result, dict):
-                    metrics = result.get('metrics', {})
-                    total_revenue += metrics.get('total_revenue_90d', 0)
-                    total_messages += metrics.get('total_messages_sent', 0)
+        if index.successful_count:
+            total_revenue = float(index.revenue_90d.sum())
+            total_messages = int(index.messages_sent.sum())
 
             summary['aggregated_metrics'] = {
                 'total_revenue_analyzed': round(total_revenue, 2),
                 'total_messages_analyzed': total_messages,
-                'avg_revenue_per_creator': round(total_revenue / len(successful_results), 2)
+                'avg_revenue_per_creator': round(total_revenue / index.successful_count, 2)
             }
 
         return summary
 
     @staticmethod
-    def get_top_performers(batch_results: Dict, top_n: int = 10) -> List[Dict]:
+    def to_json(obj: Dict) -> str:
+        """
+        Serialize a batch summary or results dict to JSON.
+        Non-string keys (e.g. the tuple keys of type_performance) are
+        stringified and NaN becomes null, so the output is valid JSON and the
+        same with either backend. Uses orjson when installed, else json.
+        """
+
+        obj = _json_safe(obj)
+
+        if orjson is not None:
+            return orjson.dumps(obj, default=_json_default).decode('utf-8')
+
+        return json.dumps(
+            obj,
+            default=_json_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(',', ':')
+        )
+
+    @staticmethod
+    def get_top_performers(
+        batch_results: Dict,
+        top_n: int = 10,
+        index: Optional[BatchResultIndex] = None
+    ) -> List[Dict]:
         """
         Extract top performing creators from batch results.
 
         Args:
             batch_results: Output from BatchProcessor
             top_n: Number of top performers to return
+            index: Prebuilt BatchResultIndex to reuse (built if omitted)
 
         Returns:
             List of top performers with key metrics
         """
 
-        performers = []
+        if index is None:
+            index = BatchResultIndex(batch_results)
 
-        for page_name, result in batch_results['results'].items():
-            if 'error' not in result and isinstance(result, dict):
-                metrics = result.get('metrics', {})
-                classification = result.get('classification', {})
+        revenue = index.revenue_90d
+        if top_n <= 0 or len(revenue) == 0:
+            return []
 
-                performers.append({
-                    'page_name': page_name,
-                    'revenue_90d': metrics.get('total_revenue_90d', 0),
-                    'avg_daily_revenue': metrics.get('avg_daily_revenue', 0),
-                    'tier': classification.get('tier', 'UNKNOWN'),
-                    'health_status': classification.get('health_status', 'UNKNOWN')
-                })
+        # Quickselect the N-th largest revenue, then stable-sort only the
+        # creators at or above it (ties keep input order, as a full sort would)
+        if top_n < len(revenue):
+            kth = len(revenue) - top_n
+            threshold = np.partition(revenue, kth)[kth]
+            candidates = np.flatnonzero(revenue >= threshold)
+        else:
+            candidates = np.arange(len(revenue))
 
-        # Sort by revenue
-        performers.sort(key=lambda x: x['revenue_90d'], reverse=True)
+        top = candidates[np.argsort(-revenue[candidates], kind='stable')][:top_n]
 
-        return performers[:top_n]
+        return [index.performer(i) for i in top]
 
 
 if __name__ == "__main__":
     # Example usage
     from python.analytics.performance_engine import PerformanceEngine
 
+    # Create batch processor
+    processor = BatchProcessor(max_workers=10)
+
+    # One engine shared across workers so the BigQuery clients (the
+    # processor's own) and the vault cache are reused
+    engine = PerformanceEngine(
+        client=processor.client,
+        bqstorage_client=processor.bqstorage_client
+    )
+
     def analyze_creator(page_name: str) -> Dict:
         """Example processing function"""
-        engine = PerformanceEngine()
         return engine.analyze_creator_comprehensive(page_name)
 
-    # Create batch processor
-    processor = BatchProcessor(max_workers=10)
-
     # Process all creators
     results = processor.process_all_creators(analyze_creator)
 
-    # Summarize
-    summary = BatchResultAggregator.summarize_batch(results)
+    # Summarize (metrics extracted once for both the summary and the ranking)
+    index = BatchResultIndex(results)
+    summary = BatchResultAggregator.summarize_batch(results, index)
 
     print(f"Processed {summary['overview']['total_creators_processed']} creators")
     print(f"Success rate: {summary['overview']['success_rate_pct']}%")
     print(f"Total time: {summary['timing']['total_seconds']}s")
 
     # Get top performers
-    top_performers = BatchResultAggregator.get_top_performers(results)
+    top_performers = BatchResultAggregator.get_top_performers(results, index=index)
     print(f"\nTop 10 performers:")
     for i, performer in enumerate(top_performers, 1):
         print(f"{i}. {performer['page_name']}: ${performer['revenue_90d']:.2f}")
@@ -84,6 +84,21 @@ OPTIONS(
     description='Cached performance analysis results to reduce BigQuery costs'
 );
 
+-- Precomputed time-of-day energy match per caption
+-- Rebuilt by ContextualCaptionSelector.refresh_caption_energy_scores (nightly);
+-- captions missing here are scored on the fly during selection
+CREATE TABLE IF NOT EXISTS `of-scheduler-proj.eros_scheduling_brain.caption_energy_scores` (
+    caption_id INT64 NOT NULL,
+    morning_score FLOAT64,
+    afternoon_score FLOAT64,
+    evening_score FLOAT64,
+    late_night_score FLOAT64
+)
+CLUSTER BY caption_id
+OPTIONS(
+    description='Caption energy scores by time period, removes text scanning from schedule generation'
+);
+
 -- ============================================
 -- BATCH PROCESSING LOGS
 -- ============================================
@@ -138,6 +153,21 @@ OPTIONS(
 -- Performance tip: Existing tables (mass_messages, caption_bank, vault_matrix)
 -- should already be partitioned and clustered for optimal performance.
 
+-- mass_messages partitioning (run separately, once)
+-- Every analytics query filters on page_name plus a sending_time lookback window.
+-- Partitioning by send date and clustering by page_name lets BigQuery prune
+-- each 90-day creator scan down to the matching partitions and blocks.
+-- CREATE TABLE `of-scheduler-proj.eros_scheduling_brain.mass_messages_partitioned`
+-- PARTITION BY DATE(sending_time)
+-- CLUSTER BY page_name
+-- AS SELECT * FROM `of-scheduler-proj.eros_scheduling_brain.mass_messages`;
+--
+-- ALTER TABLE `of-scheduler-proj.eros_scheduling_brain.mass_messages`
+-- RENAME TO mass_messages_unpartitioned;
+--
+-- ALTER TABLE `of-scheduler-proj.eros_scheduling_brain.mass_messages_partitioned`
+-- RENAME TO mass_messages;
+
 -- ============================================
 -- GRANTS & PERMISSIONS
 -- ============================================
@@ -174,6 +204,7 @@ WHERE table_name IN (
     'schedule_templates',
     'schedule_performance_log',
     'creator_analysis_cache',
+    'caption_energy_scores',
     'batch_execution_log',
     'system_alerts'
 );
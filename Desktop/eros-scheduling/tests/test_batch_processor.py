@@ -0,0 +1,89 @@
+"""Tests for batch result aggregation"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from python.analytics.performance_engine import PerformanceEngine
+from python.orchestration import batch_processor
+from python.orchestration.batch_processor import BatchResultAggregator
+
+
+@pytest.fixture
+def creator_result():
+    """Per-creator result pieces as PerformanceEngine builds them"""
+
+    # Clients are never used by the helpers below
+    engine = PerformanceEngine(client=object(), bqstorage_client=object())
+    messages = pd.DataFrame({
+        'message': ['tonight only', 'hey babe', None, 'exclusive set'],
+        'message_type': ['ppv', 'ppv', 'bump', 'bundle'],
+        'earnings': [120.0, 80.0, 0.0, 300.0],
+        'purchase_rate': [2.5, 1.5, float('nan'), 4.0],
+        'revenue_per_send': [0.12, 0.08, 0.0, 0.3]
+    })
+
+    return {
+        # type_performance is keyed by (column, aggregation) tuples
+        'content_analysis': engine._analyze_content_types(messages, ['Solo', 'BG']),
+        # All-NULL price aggregates come back as None and map to NaN
+        'metrics': engine._calculate_core_metrics({
+            'total_revenue': 500.0,
+            'weighted_revenue': 410.5,
+            'avg_daily_revenue': None,
+            'weighted_view_rate': 40.0,
+            'weighted_purchase_rate': 2.6,
+            'weighted_revenue_per_send': 0.125,
+            'total_messages': 4,
+            'avg_price': None,
+            'median_price': None,
+            'best_single_message_revenue': 300.0
+        })
+    }
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def json_backend(request, monkeypatch):
+    if request.param == 'orjson':
+        if batch_processor.orjson is None:
+            pytest.skip('orjson not installed')
+    else:
+        monkeypatch.setattr(batch_processor, 'orjson', None)
+    return request.param
+
+
+def test_to_json_encodes_per_creator_results(creator_result, json_backend):
+    batch_results = {
+        'total_creators': 1,
+        'successful': ['mayahill'],
+        'failed': [],
+        'results': {'mayahill': creator_result},
+        'timing': {}
+    }
+
+    # NaN/Infinity tokens are not valid JSON; fail if any were written
+    decoded = json.loads(
+        BatchResultAggregator.to_json(batch_results),
+        parse_constant=lambda token: pytest.fail(f'invalid JSON constant {token}')
+    )
+    result = decoded['results']['mayahill']
+
+    type_performance = result['content_analysis']['type_performance']
+    assert type_performance['earnings_sum'] == {'bump': 0.0, 'bundle': 300.0, 'ppv': 200.0}
+    assert type_performance['message_count'] == {'bump': 0, 'bundle': 1, 'ppv': 2}
+    assert type_performance['purchase_rate_mean']['bump'] is None
+
+    assert result['metrics']['avg_price'] is None
+    assert result['metrics']['median_price'] is None
+    assert result['metrics']['avg_daily_revenue'] == 0.0
+
+
+def test_to_json_backends_agree(creator_result, monkeypatch):
+    if batch_processor.orjson is None:
+        pytest.skip('orjson not installed')
+
+    with_orjson = BatchResultAggregator.to_json(creator_result)
+    monkeypatch.setattr(batch_processor, 'orjson', None)
+
+    assert json.loads(with_orjson) == json.loads(BatchResultAggregator.to_json(creator_result))
@@ -0,0 +1,86 @@
+"""Tests for schedule CSV export"""
+
+import csv
+from datetime import date
+
+from python.export.csv_formatter import (
+    MultiCreatorCSVExporter,
+    SCHEDULE_COLUMNS,
+    ScheduleCSVFormatter
+)
+
+START_DATE = date(2024, 1, 1)
+
+# Free-text fields that aren't strings, as upstream data sometimes has them
+SCHEDULE = [
+    {
+        'send_date': date(2024, 1, 1),
+        'hour': 9,
+        'day_name': 'Monday',
+        'message_type': 'ppv_bundle',
+        'caption_text': None,
+        'price': 15.0,
+        'expected_revenue': 42.5,
+        'content_category': 7,
+        'strategy_notes': 3,
+        'confidence_score': 0.8
+    },
+    {
+        'send_date': date(2024, 1, 2),
+        'hour': 20,
+        'day_name': None,
+        'caption_text': 'Tonight only',
+        'price': 0,
+        'strategy_notes': None
+    }
+]
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_export_to_csv_writes_non_str_and_none_cells(tmp_path):
+    path = ScheduleCSVFormatter.export_to_csv(
+        'mayahill', SCHEDULE, START_DATE, str(tmp_path / 'schedule.csv')
+    )
+
+    rows = read_rows(path)
+    assert [row['Date'] for row in rows] == ['2024-01-01', '2024-01-02']
+
+    first, second = rows
+    assert first['Caption'] == ''
+    assert first['Content_Category'] == '7'
+    assert first['Strategy_Note'] == '3'
+    assert first['Type'] == 'Ppv Bundle'
+    assert second['Day'] == ''
+    assert second['Strategy_Note'] == ''
+    assert second['Price'] == 'FREE'
+
+
+def test_stream_export_matches_export_to_csv(tmp_path):
+    arrow_path = ScheduleCSVFormatter.export_to_csv(
+        'mayahill', SCHEDULE, START_DATE, str(tmp_path / 'arrow.csv')
+    )
+    stream_path = ScheduleCSVFormatter.export_to_csv_stream(
+        'mayahill', SCHEDULE, START_DATE, str(tmp_path / 'stream.csv')
+    )
+
+    arrow_rows = read_rows(arrow_path)
+    stream_rows = read_rows(stream_path)
+    assert list(stream_rows[0]) == list(SCHEDULE_COLUMNS)
+
+    # Minutes are random per export; every other cell must match
+    for row in arrow_rows + stream_rows:
+        row.pop('Time')
+    assert stream_rows == arrow_rows
+
+
+def test_export_all_creators_keeps_creators_with_non_str_cells(tmp_path):
+    paths = MultiCreatorCSVExporter.export_all_creators(
+        {'mayahill': SCHEDULE}, START_DATE, str(tmp_path)
+    )
+
+    assert len(paths) == 1
+    assert len(read_rows(paths[0])) == len(SCHEDULE)